@@ -1 +1,11 @@
-# API package
\ No newline at end of file
+# API package
+from fastapi import APIRouter
+from app.api.projects import router as projects_router
+from app.api.upload import router as upload_router
+from app.api.progress import router as progress_router
+
+# Every endpoint lives under /api/projects; declare the prefix once
+router = APIRouter(prefix="/api/projects")
+router.include_router(projects_router)
+router.include_router(upload_router)
+router.include_router(progress_router)
\ No newline at end of file
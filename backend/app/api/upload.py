@@ -1,120 +1,202 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from app.database.connection import get_db
-from app.services.upload_service import UploadService
-from app.schemas.upload import UploadResponse, UploadError
-from typing import List
-import logging
-
-logger = logging.getLogger(__name__)
-
-router = APIRouter(prefix="/api/projects", tags=["upload"])
-
-@router.post("/{project_id}/upload", response_model=UploadResponse)
-async def upload_images(
-    project_id: str,
-    files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db)
-):
-    """
-    Upload and process images for object detection
-    
-    - **project_id**: ID of the project to upload images for
-    - **files**: List of image files (JPEG, PNG, BMP, TIFF)
-    
-    Returns detection results for all uploaded images.
-    """
-    try:
-        service = UploadService(db)
-        result = await service.process_uploads(project_id, files)
-        
-        logger.info(f"Successfully processed {len(files)} files for project {project_id}")
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error in upload endpoint: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error during upload processing"
-        )
-
-@router.get("/{project_id}/images")
-async def get_project_images(
-    project_id: str,
-    db: Session = Depends(get_db)
-):
-    """
-    Get list of uploaded images for a project
-    
-    - **project_id**: ID of the project
-    
-    Returns list of image file paths.
-    """
-    try:
-        service = UploadService(db)
-        images = service.get_project_images(project_id)
-        
-        return {
-            "project_id": project_id,
-            "images": images,
-            "count": len(images)
-        }
-        
-    except Exception as e:
-        logger.error(f"Error getting images for project {project_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve project images"
-        )
-
-@router.get("/{project_id}/detections")
-async def get_project_detections(
-    project_id: str,
-    db: Session = Depends(get_db)
-):
-    """
-    Get detection results for a project
-    
-    - **project_id**: ID of the project
-    
-    Returns detection results and summary.
-    """
-    try:
-        from app.models.project import Detection, Project
-        
-        # Verify project exists
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
-        
-        # Get all detections for the project
-        detections = db.query(Detection).filter(Detection.project_id == project_id).all()
-        
-        # Group detections by image
-        detections_by_image = {}
-        for detection in detections:
-            if detection.image_path not in detections_by_image:
-                detections_by_image[detection.image_path] = []
-            detections_by_image[detection.image_path].append({
-                "name": detection.object_name,
-                "confidence": detection.confidence,
-                "bbox": [detection.bbox_x, detection.bbox_y, detection.bbox_width, detection.bbox_height]
-            })
-        
-        return {
-            "project_id": project_id,
-            "total_detections": len(detections),
-            "images_processed": len(detections_by_image),
-            "detections_by_image": detections_by_image
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting detections for project {project_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve project detections"
-        )
\ No newline at end of file
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.connection import get_db
+from app.services.upload_service import UploadService
+from app.services.detection_service import DetectionService
+from app.services.response_cache import response_cache
+from app.schemas.upload import UploadResponse, UploadError
+from app.config import settings
+from typing import List, Literal, Optional
+from collections import defaultdict
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["upload"])
+
+# Content types clients may send for image files
+GENERIC_CONTENT_TYPES = {"application/octet-stream"}
+ALLOWED_EXTENSIONS = frozenset(settings.allowed_extensions)
+
+def get_detector(request: Request) -> Optional[DetectionService]:
+    """Detection service preloaded and warmed up in the app lifespan, if it loaded"""
+    return getattr(request.app.state, "detector", None)
+
+def _reject_unsupported_files(files: List[UploadFile]):
+    """Fail fast on file types we would never process"""
+    for file in files:
+        file_ext = os.path.splitext(file.filename or "")[1].lower()
+        content_type = (file.content_type or "application/octet-stream").lower()
+        is_image = content_type.startswith("image/") or content_type in GENERIC_CONTENT_TYPES
+        if file_ext not in ALLOWED_EXTENSIONS or not is_image:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File {file.filename} has unsupported format. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
+            )
+
+@router.post("/{project_id}/upload", response_model=UploadResponse)
+async def upload_images(
+    project_id: str,
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db),
+    detector: Optional[DetectionService] = Depends(get_detector)
+):
+    """
+    Upload and process images for object detection
+    
+    - **project_id**: ID of the project to upload images for
+    - **files**: List of image files (JPEG, PNG, BMP, TIFF)
+    
+    Returns detection results for all uploaded images.
+    """
+    try:
+        # Reject bad files before touching the database or disk
+        _reject_unsupported_files(files)
+        
+        service = UploadService(db, detector)
+        result = await service.process_uploads(project_id, files)
+        
+        logger.info(f"Successfully processed {len(files)} files for project {project_id}")
+        # The service builds the response from typed values; dump it straight
+        # to orjson instead of re-validating every box against response_model
+        return ORJSONResponse(result.model_dump())
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in upload endpoint: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during upload processing"
+        )
+
+@router.get("/{project_id}/images")
+async def get_project_images(
+    project_id: str,
+    db: AsyncSession = Depends(get_db),
+    detector: Optional[DetectionService] = Depends(get_detector)
+):
+    """
+    Get list of uploaded images for a project
+    
+    - **project_id**: ID of the project
+    
+    Returns list of image file paths.
+    """
+    try:
+        service = UploadService(db, detector)
+        images = service.get_project_images(project_id)
+        
+        return {
+            "project_id": project_id,
+            "images": images,
+            "count": len(images)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting images for project {project_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve project images"
+        )
+
+@router.get("/{project_id}/detections")
+async def get_project_detections(
+    project_id: str,
+    format: Literal["full", "compact"] = Query("full"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get detection results for a project
+    
+    - **project_id**: ID of the project
+    - **format**: `full` for one object per detection, `compact` for parallel
+      `names`/`confidences`/`bboxes` arrays per image
+    
+    Returns detection results and summary.
+    """
+    try:
+        from app.models.project import Detection, Project
+        
+        # Serve repeated polls from cache until the project's detections change
+        cache_key = await response_cache.make_key(db, f"detections:{format}", project_id)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+        
+        # Fetch only the columns we need; the outer join keeps a single row
+        # (with NULL detection columns) for a project that has no detections
+        stmt = (
+            select(
+                Detection.image_path,
+                Detection.object_name,
+                Detection.confidence,
+                Detection.bbox_x,
+                Detection.bbox_y,
+                Detection.bbox_width,
+                Detection.bbox_height
+            )
+            .select_from(Project)
+            .outerjoin(Detection, Detection.project_id == Project.id)
+            .where(Project.id == project_id)
+        )
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+        
+        # Group detections by image
+        if format == "compact":
+            detections_by_image = _group_detections_compact(rows)
+            total_detections = sum(len(image["names"]) for image in detections_by_image.values())
+        else:
+            detections_by_image = _group_detections(rows)
+            total_detections = sum(len(image) for image in detections_by_image.values())
+        
+        response = {
+            "project_id": project_id,
+            "total_detections": total_detections,
+            "images_processed": len(detections_by_image),
+            "detections_by_image": detections_by_image
+        }
+        response_cache.set(cache_key, response)
+        # The dict only holds primitives, so skip jsonable_encoder and let orjson encode it
+        return ORJSONResponse(response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting detections for project {project_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve project detections"
+        )
+
+def _group_detections(rows) -> dict:
+    """Group detection rows by image as one object per detection"""
+    detections_by_image = defaultdict(list)
+    for image_path, name, confidence, x, y, width, height in rows:
+        if image_path is None:
+            continue
+        detections_by_image[image_path].append({
+            "name": name,
+            "confidence": confidence,
+            "bbox": [x, y, width, height]
+        })
+    return dict(detections_by_image)
+
+def _group_detections_compact(rows) -> dict:
+    """Group detection rows by image as parallel name/confidence/bbox arrays"""
+    detections_by_image = {}
+    for image_path, name, confidence, x, y, width, height in rows:
+        if image_path is None:
+            continue
+        image = detections_by_image.get(image_path)
+        if image is None:
+            image = detections_by_image[image_path] = {"names": [], "confidences": [], "bboxes": []}
+        image["names"].append(name)
+        image["confidences"].append(confidence)
+        image["bboxes"].append([x, y, width, height])
+    return detections_by_image
\ No newline at end of file
@@ -1,55 +1,71 @@
-import os
-from typing import List
-from pydantic_settings import BaseSettings
-
-def parse_cors_origins(v: str) -> List[str]:
-    """Parse comma-separated CORS origins from environment variable."""
-    if isinstance(v, list):
-        return v
-    if v:
-        return [origin.strip() for origin in v.split(",") if origin.strip()]
-    return ["http://localhost:3000"]
-
-class Settings(BaseSettings):
-    # Database
-    database_url: str = "sqlite:///./sytescan.db"
-    
-    # File Storage
-    upload_dir: str = "./uploads"
-    max_file_size: int = 10 * 1024 * 1024  # 10MB
-    allowed_extensions: List[str] = [".jpg", ".jpeg", ".png"]
-    
-    # Security
-    secret_key: str = "dev-secret-key-change-in-production"
-    cors_origins_str: str = "http://localhost:3000,https://sytescan.vercel.app,https://sytescan-frontend.vercel.app,https://sytescan.onrender.com,https://sytescan-frontend.onrender.com"
-    
-    @property
-    def cors_origins(self) -> List[str]:
-        """Parse CORS origins from comma-separated string."""
-        return parse_cors_origins(self.cors_origins_str)
-    
-    # Logging
-    log_level: str = "INFO"
-    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    
-    # YOLOv8 Configuration - Use NANO model for Render free tier
-    yolo_model: str = "yolov8n.pt"  # Nano model for low memory environments
-    detection_confidence: float = 0.5
-    
-    # Model performance notes:
-    # yolov8n.pt - Fastest, lowest accuracy (~3.2M params)
-    # yolov8s.pt - Good balance (~11.2M params) 
-    # yolov8m.pt - Better accuracy (~25.9M params)
-    # yolov8l.pt - High accuracy (~43.7M params)
-    # yolov8x.pt - Highest accuracy, slowest (~68.2M params)
-    
-    # Performance
-    max_workers: int = 4
-    request_timeout: int = 300  # 5 minutes
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-
-# Global settings instance
+import os
+from functools import cached_property
+from typing import List
+from pydantic_settings import BaseSettings
+
+def parse_cors_origins(v: str) -> List[str]:
+    """Parse comma-separated CORS origins from environment variable."""
+    if isinstance(v, list):
+        return v
+    if v:
+        return [origin.strip() for origin in v.split(",") if origin.strip()]
+    return ["http://localhost:3000"]
+
+class Settings(BaseSettings):
+    # Database
+    database_url: str = "sqlite:///./sytescan.db"
+    
+    # File Storage
+    upload_dir: str = "./uploads"
+    max_file_size: int = 10 * 1024 * 1024  # 10MB
+    max_files_per_upload: int = 10
+    allowed_extensions: List[str] = [".jpg", ".jpeg", ".png", ".bmp", ".tiff"]
+    
+    # Security
+    secret_key: str = "dev-secret-key-change-in-production"
+    cors_origins_str: str = "http://localhost:3000,https://sytescan.vercel.app,https://sytescan-frontend.vercel.app,https://sytescan.onrender.com,https://sytescan-frontend.onrender.com"
+    
+    @cached_property
+    def cors_origins(self) -> List[str]:
+        """Parse CORS origins from comma-separated string (once per instance)."""
+        return parse_cors_origins(self.cors_origins_str)
+    
+    # Logging
+    log_level: str = "INFO"
+    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    
+    # YOLOv8 Configuration - Use NANO model for Render free tier
+    yolo_model: str = "yolov8n.pt"  # Nano model for low memory environments
+    detection_confidence: float = 0.5
+    image_size: int = 640  # Model input size; compute scales with its square (e.g. 480 on CPU hosts)
+    cpu_bfloat16: bool = False  # bfloat16 autocast for CPU inference (fast on AVX-512 BF16 / AMX CPUs)
+    
+    # Model performance notes:
+    # yolov8n.pt - Fastest, lowest accuracy (~3.2M params)
+    # yolov8s.pt - Good balance (~11.2M params) 
+    # yolov8m.pt - Better accuracy (~25.9M params)
+    # yolov8l.pt - High accuracy (~43.7M params)
+    # yolov8x.pt - Highest accuracy, slowest (~68.2M params)
+    
+    # TensorRT acceleration (GPU only; CPU deployments keep the .pt model)
+    use_tensorrt: bool = True
+    tensorrt_int8: bool = False  # Requires calibration data, or accuracy drops sharply
+    tensorrt_calibration_data: str = ""  # Ultralytics dataset YAML of representative images
+    tensorrt_cache_dir: str = "trt_cache"  # Built engines, one per model/input size/batch/precision
+    # Replay a captured CUDA Graph of the PyTorch forward pass (GPU only, ignored with TensorRT)
+    enable_cuda_graph: bool = False
+    
+    # Performance
+    max_workers: int = 4
+    batch_size: int = 8  # Images per YOLO inference call
+    batch_max_wait: float = 0.05  # seconds to wait for more saved files before running a partial batch
+    response_cache_size: int = 1024
+    response_cache_ttl: int = 30  # seconds
+    request_timeout: int = 300  # 5 minutes
+    
+    class Config:
+        env_file = ".env"
+        case_sensitive = False
+
+# Global settings instance
 settings = Settings()
\ No newline at end of file
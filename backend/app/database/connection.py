@@ -1,30 +1,163 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
-import os
-
-# Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sytescan.db")
-
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
-
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Create Base class for models
-Base = declarative_base()
-
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def create_tables():
-    """Create all tables in the database"""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+from sqlalchemy import Column, Integer, Table, Uuid, delete, event, inspect, insert, select, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+import os
+import uuid
+
+# Database configuration
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sytescan.db")
+
+# Async drivers for the plain URL schemes used in .env files
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Rewrite a plain database URL to use its asyncio driver"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+def engine_options(url: str) -> dict:
+    """Connection pool settings for the configured database"""
+    if url.startswith("sqlite"):
+        if ":memory:" in url:
+            # Every connection would get its own empty database
+            return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+        # Keep a few connections open so each one's page cache and pragmas
+        # survive between sessions instead of reopening the file every time
+        return {
+            "connect_args": {"check_same_thread": False},
+            # aiosqlite defaults to NullPool for file databases
+            "poolclass": AsyncAdaptedQueuePool,
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        }
+    # Leave headroom for concurrent requests plus upload worker tasks, and
+    # recycle connections before server-side idle timeouts drop them
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_pre_ping": True,
+        "pool_recycle": 1800
+    }
+
+# Create SQLAlchemy engine
+engine = create_async_engine(to_async_url(DATABASE_URL), **engine_options(DATABASE_URL))
+
+def set_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """Use WAL journaling so uploads can write while progress polls read"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    # Wait for a concurrent writer instead of failing with SQLITE_BUSY
+    cursor.execute("PRAGMA busy_timeout=5000")
+    # Temp tables and sort spill in memory; 64MB page cache per connection
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+
+# Create SessionLocal class
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Create Base class for models
+Base = declarative_base()
+
+# Bump whenever tables, indexes or stored key formats change, so the next
+# start runs create_tables' DDL and migrations again
+SCHEMA_VERSION = 1
+
+schema_meta = Table("schema_meta", Base.metadata, Column("version", Integer, nullable=False))
+
+async def get_db():
+    """Dependency to get database session"""
+    async with SessionLocal() as db:
+        yield db
+
+def create_indexes(connection):
+    """Create indexes added to the models after their tables already existed"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+# Key columns that older releases stored as 36-character UUID text
+UUID_KEY_COLUMNS = {
+    "projects": ("id",),
+    "requirements": ("id", "project_id"),
+    "detections": ("id", "project_id"),
+}
+
+def migrate_uuid_keys(connection):
+    """Convert text UUID keys left by older releases to the UUIDKey storage of the dialect"""
+    if connection.dialect.name == "postgresql":
+        migrate_uuid_keys_postgresql(connection)
+        return
+    if connection.dialect.name != "sqlite":
+        return
+    for table, columns in UUID_KEY_COLUMNS.items():
+        for column in columns:
+            rows = connection.execute(
+                text(f"SELECT DISTINCT {column} FROM {table} WHERE typeof({column}) = 'text'")
+            ).all()
+            for (value,) in rows:
+                connection.execute(
+                    text(f"UPDATE {table} SET {column} = :key WHERE {column} = :value"),
+                    {"key": uuid.UUID(value).bytes, "value": value}
+                )
+
+def migrate_uuid_keys_postgresql(connection):
+    """Retype VARCHAR UUID key columns to native uuid on PostgreSQL"""
+    inspector = inspect(connection)
+    text_columns = [
+        (table, column["name"])
+        for table, columns in UUID_KEY_COLUMNS.items()
+        for column in inspector.get_columns(table)
+        if column["name"] in columns and not isinstance(column["type"], Uuid)
+    ]
+    if not text_columns:
+        return
+    
+    # Both ends of a foreign key must share a type, so drop the keys around the change
+    foreign_keys = [(table, fk) for table in UUID_KEY_COLUMNS for fk in inspector.get_foreign_keys(table)]
+    for table, fk in foreign_keys:
+        connection.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{fk["name"]}"'))
+    for table, column in text_columns:
+        connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE uuid USING {column}::uuid"))
+    for table, fk in foreign_keys:
+        connection.execute(text(
+            f'ALTER TABLE {table} ADD CONSTRAINT "{fk["name"]}" '
+            f'FOREIGN KEY ({", ".join(fk["constrained_columns"])}) '
+            f'REFERENCES {fk["referred_table"]} ({", ".join(fk["referred_columns"])})'
+        ))
+
+def read_schema_version(connection):
+    """Schema version recorded by the last create_tables, or None for an older database"""
+    if not inspect(connection).has_table(schema_meta.name):
+        return None
+    return connection.execute(select(schema_meta.c.version)).scalar()
+
+def ensure_schema(connection) -> bool:
+    """Create tables, indexes and migrate keys unless already at SCHEMA_VERSION; True if it ran"""
+    if read_schema_version(connection) == SCHEMA_VERSION:
+        return False
+    Base.metadata.create_all(connection)
+    create_indexes(connection)
+    migrate_uuid_keys(connection)
+    connection.execute(delete(schema_meta))
+    connection.execute(insert(schema_meta).values(version=SCHEMA_VERSION))
+    return True
+
+async def create_tables():
+    """Create all tables and indexes in the database"""
+    async with engine.begin() as conn:
+        await conn.run_sync(ensure_schema)
\ No newline at end of file
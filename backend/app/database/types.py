@@ -0,0 +1,36 @@
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+import uuid
+
+class UUIDKey(TypeDecorator):
+    """
+    UUID primary/foreign key exposed to Python as its canonical string
+    
+    Stored as a native UUID on PostgreSQL and as 16 raw bytes elsewhere,
+    instead of 36 characters of text, which keeps key indexes small.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            key = value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+        except ValueError:
+            # Ids that are not UUIDs (e.g. from a mistyped URL) cannot match any row
+            return None if dialect.name == "postgresql" else value.encode()
+        return key if dialect.name == "postgresql" else key.bytes
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(bytes=value))
\ No newline at end of file
@@ -1,54 +1,54 @@
-"""
-Custom exceptions for SyteScan application
-"""
-from typing import Any, Dict, Optional
-
-
-class SyteScanException(Exception):
-    """Base exception for SyteScan application"""
-    
-    def __init__(
-        self, 
-        message: str, 
-        status_code: int = 500, 
-        details: Optional[Dict[str, Any]] = None
-    ):
-        self.message = message
-        self.status_code = status_code
-        self.details = details or {}
-        super().__init__(self.message)
-
-
-class ValidationError(SyteScanException):
-    """Raised when input validation fails"""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, status_code=400, details=details)
-
-
-class DetectionError(SyteScanException):
-    """Raised when object detection fails"""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, status_code=422, details=details)
-
-
-class NotFoundError(SyteScanException):
-    """Raised when a resource is not found"""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, status_code=404, details=details)
-
-
-class DatabaseError(SyteScanException):
-    """Raised when database operations fail"""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, status_code=500, details=details)
-
-
-class FileUploadError(SyteScanException):
-    """Raised when file upload operations fail"""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+"""
+Custom exceptions for SyteScan application
+"""
+from typing import Any, Dict, Optional
+
+
+class SyteScanException(Exception):
+    """Base exception for SyteScan application"""
+    
+    def __init__(
+        self, 
+        message: str, 
+        status_code: int = 500, 
+        details: Optional[Dict[str, Any]] = None
+    ):
+        self.message = message
+        self.status_code = status_code
+        self.details = details or {}
+        super().__init__(self.message)
+
+
+class ValidationError(SyteScanException):
+    """Raised when input validation fails"""
+    
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, status_code=400, details=details)
+
+
+class DetectionError(SyteScanException):
+    """Raised when object detection fails"""
+    
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, status_code=422, details=details)
+
+
+class NotFoundError(SyteScanException):
+    """Raised when a resource is not found"""
+    
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, status_code=404, details=details)
+
+
+class DatabaseError(SyteScanException):
+    """Raised when database operations fail"""
+    
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, status_code=500, details=details)
+
+
+class FileUploadError(SyteScanException):
+    """Raised when file upload operations fail"""
+    
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(message, status_code=400, details=details)
\ No newline at end of file
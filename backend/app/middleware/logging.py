@@ -1,90 +1,114 @@
-import time
-import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.config import settings
-
-logger = logging.getLogger(__name__)
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for structured logging and performance monitoring"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Start timing
-        start_time = time.time()
-        
-        # Extract request information
-        client_ip = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
-        
-        # Log request
-        logger.info(
-            "Request started",
-            extra={
-                "method": request.method,
-                "url": str(request.url),
-                "client_ip": client_ip,
-                "user_agent": user_agent,
-                "request_id": id(request)
-            }
-        )
-        
-        try:
-            # Process request
-            response = await call_next(request)
-            
-            # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Log response
-            logger.info(
-                "Request completed",
-                extra={
-                    "method": request.method,
-                    "url": str(request.url),
-                    "status_code": response.status_code,
-                    "process_time": round(process_time, 4),
-                    "client_ip": client_ip,
-                    "request_id": id(request)
-                }
-            )
-            
-            # Add performance headers
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            # Log slow requests
-            if process_time > 5.0:  # 5 seconds threshold
-                logger.warning(
-                    "Slow request detected",
-                    extra={
-                        "method": request.method,
-                        "url": str(request.url),
-                        "process_time": round(process_time, 4),
-                        "client_ip": client_ip,
-                        "request_id": id(request)
-                    }
-                )
-            
-            return response
-            
-        except Exception as e:
-            # Calculate processing time for failed requests
-            process_time = time.time() - start_time
-            
-            # Log error
-            logger.error(
-                "Request failed",
-                extra={
-                    "method": request.method,
-                    "url": str(request.url),
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                    "process_time": round(process_time, 4),
-                    "client_ip": client_ip,
-                    "request_id": id(request)
-                }
-            )
-            
-            # Re-raise the exception
-            raise
\ No newline at end of file
+import time
+import uuid
+import logging
+from contextvars import ContextVar
+from typing import Callable, Optional
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Frequently polled endpoints that only get a completion log line
+QUIET_PATH_PREFIXES = ("/health", "/metrics")
+
+# Id of the request being handled in the current context
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request id to every log record"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class LoggingMiddleware(BaseHTTPMiddleware):
+    """Middleware for structured logging and performance monitoring"""
+    
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        # Start timing
+        start_time = time.perf_counter()
+        
+        # Assign a request id shared by logs and error responses
+        request_id = uuid.uuid4().hex
+        request.state.request_id = request_id
+        token = request_id_var.set(request_id)
+        
+        # Extract request information once
+        method = request.method
+        url = str(request.url)
+        client_ip = request.client.host if request.client else "unknown"
+        log_info = logger.isEnabledFor(logging.INFO)
+        
+        # Log request, except for health and metrics polling
+        if log_info and not request.url.path.startswith(QUIET_PATH_PREFIXES):
+            logger.info(
+                "Request started",
+                extra={
+                    "method": method,
+                    "url": url,
+                    "client_ip": client_ip,
+                    "user_agent": request.headers.get("user-agent", "unknown")
+                }
+            )
+        
+        try:
+            # Process request
+            response = await call_next(request)
+            
+            # Calculate processing time
+            process_time = time.perf_counter() - start_time
+            
+            # Log response
+            if log_info:
+                logger.info(
+                    "Request completed",
+                    extra={
+                        "method": method,
+                        "url": url,
+                        "status_code": response.status_code,
+                        "process_time": round(process_time, 4),
+                        "client_ip": client_ip
+                    }
+                )
+            
+            # Add performance headers
+            response.headers["X-Process-Time"] = str(process_time)
+            response.headers["X-Request-ID"] = request_id
+            
+            # Log slow requests
+            if process_time > 5.0:  # 5 seconds threshold
+                logger.warning(
+                    "Slow request detected",
+                    extra={
+                        "method": method,
+                        "url": url,
+                        "process_time": round(process_time, 4),
+                        "client_ip": client_ip
+                    }
+                )
+            
+            return response
+            
+        except Exception as e:
+            # Calculate processing time for failed requests
+            process_time = time.perf_counter() - start_time
+            
+            # Log error
+            logger.error(
+                "Request failed",
+                extra={
+                    "method": method,
+                    "url": url,
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                    "process_time": round(process_time, 4),
+                    "client_ip": client_ip
+                }
+            )
+            
+            # Re-raise the exception
+            raise
+        
+        finally:
+            request_id_var.reset(token)
\ No newline at end of file
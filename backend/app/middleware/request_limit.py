@@ -0,0 +1,46 @@
+"""
+Request size limiting middleware
+"""
+import logging
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.middleware.error_handler import build_error_response
+
+logger = logging.getLogger(__name__)
+
+
+class RequestSizeLimitMiddleware:
+    """Reject oversized requests from their Content-Length before the body is read"""
+    
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            content_length = self._content_length(scope)
+            if content_length is not None and content_length > self.max_body_size:
+                logger.warning(f"Rejected request of {content_length} bytes to {scope['path']}")
+                response = JSONResponse(
+                    status_code=413,
+                    content=build_error_response(
+                        error="PayloadTooLarge",
+                        message=f"Request body too large. Maximum size: {self.max_body_size // (1024 * 1024)}MB",
+                        status_code=413
+                    )
+                )
+                await response(scope, receive, send)
+                return
+        
+        await self.app(scope, receive, send)
+    
+    @staticmethod
+    def _content_length(scope: Scope):
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
\ No newline at end of file
@@ -1,45 +1,55 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from app.database.connection import Base
-import uuid
-
-class Project(Base):
-    __tablename__ = "projects"
-    
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    name = Column(String, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    
-    # Relationships
-    requirements = relationship("Requirement", back_populates="project", cascade="all, delete-orphan")
-    detections = relationship("Detection", back_populates="project", cascade="all, delete-orphan")
-
-class Requirement(Base):
-    __tablename__ = "requirements"
-    
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    project_id = Column(String, ForeignKey("projects.id"), nullable=False)
-    object_name = Column(String, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    # Relationships
-    project = relationship("Project", back_populates="requirements")
-
-class Detection(Base):
-    __tablename__ = "detections"
-    
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    project_id = Column(String, ForeignKey("projects.id"), nullable=False)
-    image_path = Column(String, nullable=False)
-    object_name = Column(String, nullable=False)
-    confidence = Column(Float, nullable=False)
-    bbox_x = Column(Float)
-    bbox_y = Column(Float)
-    bbox_width = Column(Float)
-    bbox_height = Column(Float)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    # Relationships
+from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database.connection import Base
+from app.database.types import UUIDKey
+import uuid
+
+class Project(Base):
+    __tablename__ = "projects"
+    
+    id = Column(UUIDKey, primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    requirements = relationship("Requirement", back_populates="project", cascade="all, delete-orphan")
+    detections = relationship("Detection", back_populates="project", cascade="all, delete-orphan")
+
+class Requirement(Base):
+    __tablename__ = "requirements"
+    __table_args__ = (
+        Index("ix_requirements_project", "project_id"),
+    )
+    
+    id = Column(UUIDKey, primary_key=True, default=lambda: str(uuid.uuid4()))
+    project_id = Column(UUIDKey, ForeignKey("projects.id"), nullable=False)
+    object_name = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    project = relationship("Project", back_populates="requirements")
+
+class Detection(Base):
+    __tablename__ = "detections"
+    __table_args__ = (
+        # Per-project aggregation by object name (progress calculation)
+        Index("ix_detections_project_object", "project_id", "object_name"),
+        # Per-project grouping by image (detections endpoint)
+        Index("ix_detections_project_image", "project_id", "image_path"),
+    )
+    
+    id = Column(UUIDKey, primary_key=True, default=lambda: str(uuid.uuid4()))
+    project_id = Column(UUIDKey, ForeignKey("projects.id"), nullable=False)
+    image_path = Column(String, nullable=False)
+    object_name = Column(String, nullable=False)
+    confidence = Column(Float, nullable=False)
+    bbox_x = Column(Float)
+    bbox_y = Column(Float)
+    bbox_width = Column(Float)
+    bbox_height = Column(Float)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
     project = relationship("Project", back_populates="detections")
\ No newline at end of file
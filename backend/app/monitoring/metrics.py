@@ -1,113 +1,168 @@
-import time
-import psutil
-import logging
-from typing import Dict, Any
-from datetime import datetime, timedelta
-from collections import defaultdict, deque
-
-logger = logging.getLogger(__name__)
-
-class PerformanceMonitor:
-    """Performance monitoring and metrics collection"""
-    
-    def __init__(self):
-        self.request_times = deque(maxlen=1000)  # Keep last 1000 requests
-        self.error_counts = defaultdict(int)
-        self.endpoint_stats = defaultdict(lambda: {"count": 0, "total_time": 0, "errors": 0})
-        self.start_time = datetime.now()
-    
-    def record_request(self, method: str, endpoint: str, duration: float, status_code: int):
-        """Record request metrics"""
-        self.request_times.append(duration)
-        
-        key = f"{method} {endpoint}"
-        self.endpoint_stats[key]["count"] += 1
-        self.endpoint_stats[key]["total_time"] += duration
-        
-        if status_code >= 400:
-            self.endpoint_stats[key]["errors"] += 1
-            self.error_counts[status_code] += 1
-    
-    def get_system_metrics(self) -> Dict[str, Any]:
-        """Get current system metrics"""
-        try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
-            return {
-                "cpu_percent": cpu_percent,
-                "memory_percent": memory.percent,
-                "memory_available_mb": memory.available // (1024 * 1024),
-                "disk_percent": disk.percent,
-                "disk_free_gb": disk.free // (1024 * 1024 * 1024)
-            }
-        except Exception as e:
-            logger.error(f"Failed to get system metrics: {e}")
-            return {}
-    
-    def get_application_metrics(self) -> Dict[str, Any]:
-        """Get application performance metrics"""
-        uptime = datetime.now() - self.start_time
-        
-        # Calculate request statistics
-        if self.request_times:
-            avg_response_time = sum(self.request_times) / len(self.request_times)
-            max_response_time = max(self.request_times)
-            min_response_time = min(self.request_times)
-        else:
-            avg_response_time = max_response_time = min_response_time = 0
-        
-        # Calculate endpoint statistics
-        endpoint_metrics = {}
-        for endpoint, stats in self.endpoint_stats.items():
-            if stats["count"] > 0:
-                endpoint_metrics[endpoint] = {
-                    "requests": stats["count"],
-                    "avg_response_time": stats["total_time"] / stats["count"],
-                    "error_rate": stats["errors"] / stats["count"] * 100,
-                    "total_errors": stats["errors"]
-                }
-        
-        return {
-            "uptime_seconds": uptime.total_seconds(),
-            "total_requests": len(self.request_times),
-            "avg_response_time": round(avg_response_time, 4),
-            "max_response_time": round(max_response_time, 4),
-            "min_response_time": round(min_response_time, 4),
-            "error_counts": dict(self.error_counts),
-            "endpoint_metrics": endpoint_metrics
-        }
-    
-    def get_health_status(self) -> Dict[str, Any]:
-        """Get overall health status"""
-        system_metrics = self.get_system_metrics()
-        app_metrics = self.get_application_metrics()
-        
-        # Determine health status
-        health_issues = []
-        
-        if system_metrics.get("cpu_percent", 0) > 80:
-            health_issues.append("High CPU usage")
-        
-        if system_metrics.get("memory_percent", 0) > 85:
-            health_issues.append("High memory usage")
-        
-        if system_metrics.get("disk_percent", 0) > 90:
-            health_issues.append("Low disk space")
-        
-        if app_metrics.get("avg_response_time", 0) > 5:
-            health_issues.append("Slow response times")
-        
-        status = "unhealthy" if health_issues else "healthy"
-        
-        return {
-            "status": status,
-            "timestamp": datetime.now().isoformat(),
-            "issues": health_issues,
-            "system": system_metrics,
-            "application": app_metrics
-        }
-
-# Global monitor instance
+import time
+import asyncio
+import psutil
+import logging
+from array import array
+from typing import Dict, Any, List
+from datetime import datetime, timedelta
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+class PerformanceMonitor:
+    """Performance monitoring and metrics collection"""
+    
+    def __init__(self, window_size: int = 1000):
+        # Ring buffer of the last `window_size` request durations
+        self.window_size = window_size
+        self.request_times = array('d', [0.0] * window_size)
+        self.window_count = 0
+        self.window_total = 0.0
+        # Monotonic (sequence, duration) queues giving the window max/min in O(1)
+        self._window_max = deque()
+        self._window_min = deque()
+        
+        self.total_requests = 0
+        self.error_counts = defaultdict(int)
+        # endpoint -> [count, total_time, errors]
+        self.endpoint_stats: Dict[str, List[float]] = {}
+        self.start_time = datetime.now()
+        
+        # Latest system sample; the first cpu_percent call only primes the counter
+        self._system_metrics: Dict[str, Any] = {}
+        psutil.cpu_percent(interval=None)
+    
+    def record_request(self, method: str, endpoint: str, duration: float, status_code: int):
+        """Record request metrics"""
+        seq = self.total_requests
+        slot = seq % self.window_size
+        
+        # Keep a running sum instead of re-summing the window on every scrape
+        if self.window_count == self.window_size:
+            self.window_total -= self.request_times[slot]
+        else:
+            self.window_count += 1
+        self.request_times[slot] = duration
+        self.window_total += duration
+        self.total_requests = seq + 1
+        
+        # Drop entries the new duration dominates, then the one leaving the window
+        while self._window_max and self._window_max[-1][1] <= duration:
+            self._window_max.pop()
+        self._window_max.append((seq, duration))
+        if self._window_max[0][0] <= seq - self.window_size:
+            self._window_max.popleft()
+        
+        while self._window_min and self._window_min[-1][1] >= duration:
+            self._window_min.pop()
+        self._window_min.append((seq, duration))
+        if self._window_min[0][0] <= seq - self.window_size:
+            self._window_min.popleft()
+        
+        key = f"{method} {endpoint}"
+        stats = self.endpoint_stats.get(key)
+        if stats is None:
+            stats = self.endpoint_stats[key] = [0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += duration
+        
+        if status_code >= 400:
+            stats[2] += 1
+            self.error_counts[status_code] += 1
+    
+    def sample_system_metrics(self) -> Dict[str, Any]:
+        """Take a system metrics sample without blocking"""
+        try:
+            # CPU usage since the previous sample instead of sleeping for one
+            cpu_percent = psutil.cpu_percent(interval=None)
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage('/')
+            
+            self._system_metrics = {
+                "cpu_percent": cpu_percent,
+                "memory_percent": memory.percent,
+                "memory_available_mb": memory.available // (1024 * 1024),
+                "disk_percent": disk.percent,
+                "disk_free_gb": disk.free // (1024 * 1024 * 1024)
+            }
+        except Exception as e:
+            logger.error(f"Failed to get system metrics: {e}")
+        return self._system_metrics
+    
+    async def run_system_sampler(self, interval: float = 5.0):
+        """Refresh the system metrics sample in the background"""
+        while True:
+            await asyncio.sleep(interval)
+            self.sample_system_metrics()
+    
+    def get_system_metrics(self) -> Dict[str, Any]:
+        """Get the latest system metrics sample"""
+        if not self._system_metrics:
+            return dict(self.sample_system_metrics())
+        return dict(self._system_metrics)
+    
+    def get_application_metrics(self) -> Dict[str, Any]:
+        """Get application performance metrics"""
+        uptime = datetime.now() - self.start_time
+        
+        # Calculate request statistics over the recent window
+        if self.window_count:
+            avg_response_time = self.window_total / self.window_count
+            max_response_time = self._window_max[0][1]
+            min_response_time = self._window_min[0][1]
+        else:
+            avg_response_time = max_response_time = min_response_time = 0
+        
+        # Calculate endpoint statistics
+        endpoint_metrics = {}
+        for endpoint, (count, total_time, errors) in self.endpoint_stats.items():
+            if count > 0:
+                endpoint_metrics[endpoint] = {
+                    "requests": count,
+                    "avg_response_time": total_time / count,
+                    "error_rate": errors / count * 100,
+                    "total_errors": errors
+                }
+        
+        return {
+            "uptime_seconds": uptime.total_seconds(),
+            "total_requests": self.total_requests,
+            "avg_response_time": round(avg_response_time, 4),
+            "max_response_time": round(max_response_time, 4),
+            "min_response_time": round(min_response_time, 4),
+            "error_counts": dict(self.error_counts),
+            "endpoint_metrics": endpoint_metrics
+        }
+    
+    def get_health_status(self) -> Dict[str, Any]:
+        """Get overall health status"""
+        system_metrics = self.get_system_metrics()
+        app_metrics = self.get_application_metrics()
+        
+        # Determine health status
+        health_issues = []
+        
+        if system_metrics.get("cpu_percent", 0) > 80:
+            health_issues.append("High CPU usage")
+        
+        if system_metrics.get("memory_percent", 0) > 85:
+            health_issues.append("High memory usage")
+        
+        if system_metrics.get("disk_percent", 0) > 90:
+            health_issues.append("Low disk space")
+        
+        if app_metrics.get("avg_response_time", 0) > 5:
+            health_issues.append("Slow response times")
+        
+        status = "unhealthy" if health_issues else "healthy"
+        
+        return {
+            "status": status,
+            "timestamp": datetime.now().isoformat(),
+            "issues": health_issues,
+            "system": system_metrics,
+            "application": app_metrics
+        }
+
+# Global monitor instance
 monitor = PerformanceMonitor()
\ No newline at end of file
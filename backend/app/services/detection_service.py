@@ -1,235 +1,599 @@
-import os
-import logging
-from typing import List, Dict, Any
-from ultralytics import YOLO
-from PIL import Image
-import numpy as np
-from pathlib import Path
-import torch
-
-logger = logging.getLogger(__name__)
-
-class DetectedObject:
-    def __init__(self, name: str, confidence: float, bbox: List[float]):
-        self.name = name
-        self.confidence = confidence
-        self.bbox = bbox  # [x, y, width, height]
-
-class DetectionService:
-    def __init__(self):
-        self.model = None
-        self._load_model()
-        
-        # YOLO class names that are relevant for construction/interior projects
-        self.relevant_objects = {
-            'chair', 'couch', 'bed', 'dining table', 'toilet', 'tv', 'laptop',
-            'mouse', 'remote', 'keyboard', 'cell phone', 'microwave', 'oven',
-            'toaster', 'sink', 'refrigerator', 'book', 'clock', 'vase',
-            'scissors', 'teddy bear', 'hair drier', 'toothbrush', 'bottle',
-            'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana',
-            'apple', 'sandwich', 'orange', 'broccoli', 'carrot', 'hot dog',
-            'pizza', 'donut', 'cake', 'potted plant', 'sofa'
-        }
-    
-    def _load_model(self):
-        """Load YOLOv8 model based on configuration"""
-        try:
-            from app.config import settings
-            model_name = settings.yolo_model
-            
-            # Validate model name
-            valid_models = [
-                'yolov8n.pt',    # Nano - fastest, lowest accuracy
-                'yolov8s.pt',    # Small - good balance
-                'yolov8m.pt',    # Medium - better accuracy
-                'yolov8l.pt',    # Large - high accuracy
-                'yolov8x.pt',    # Extra Large - highest accuracy
-                'yolov8n-seg.pt', # Nano segmentation
-                'yolov8s-seg.pt', # Small segmentation
-                'yolov8m-seg.pt', # Medium segmentation
-                'yolov8l-seg.pt', # Large segmentation
-                'yolov8x-seg.pt'  # Extra Large segmentation
-            ]
-            
-            if model_name not in valid_models:
-                logger.warning(f"Invalid model name '{model_name}', falling back to yolov8n.pt")
-                model_name = 'yolov8n.pt'
-            
-            # Fix for PyTorch 2.6+ security restrictions
-            # Add safe globals for YOLOv8 model loading
-            try:
-                # Try with safe globals first (PyTorch 2.6+)
-                with torch.serialization.safe_globals(['ultralytics.nn.tasks.DetectionModel']):
-                    self.model = YOLO(model_name)
-            except (AttributeError, TypeError):
-                # Fallback for older PyTorch versions or if safe_globals doesn't work
-                try:
-                    # Add safe globals using the new method
-                    torch.serialization.add_safe_globals(['ultralytics.nn.tasks.DetectionModel'])
-                    self.model = YOLO(model_name)
-                except (AttributeError, TypeError):
-                    # Final fallback - load with weights_only=False (less secure but works)
-                    logger.warning("Using weights_only=False for YOLOv8 model loading due to PyTorch compatibility")
-                    # Monkey patch torch.load temporarily
-                    original_load = torch.load
-                    torch.load = lambda *args, **kwargs: original_load(*args, **kwargs, weights_only=False)
-                    try:
-                        self.model = YOLO(model_name)
-                    finally:
-                        torch.load = original_load
-            
-            # Log model details
-            model_details = {
-                'yolov8n.pt': 'Nano (~3.2M params, fastest)',
-                'yolov8s.pt': 'Small (~11.2M params, fast)', 
-                'yolov8m.pt': 'Medium (~25.9M params, balanced accuracy/speed)',
-                'yolov8l.pt': 'Large (~43.7M params, high accuracy)',
-                'yolov8x.pt': 'Extra Large (~68.2M params, highest accuracy)'
-            }
-            
-            detail = model_details.get(model_name, 'Custom model')
-            logger.info(f"YOLOv8 model '{model_name}' loaded successfully - {detail}")
-            
-        except Exception as e:
-            logger.error(f"Failed to load YOLOv8 model: {str(e)}")
-            raise RuntimeError(f"Could not initialize detection model: {str(e)}")
-    
-    async def detect_objects(self, image_path: str) -> List[DetectedObject]:
-        """
-        Process image and return detected objects with confidence scores
-        
-        Args:
-            image_path: Path to the image file
-            
-        Returns:
-            List of DetectedObject instances
-        """
-        try:
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image file not found: {image_path}")
-            
-            # Run inference
-            results = self.model(image_path, verbose=False)
-            
-            detected_objects = []
-            
-            # Process results
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Get class name
-                        class_id = int(box.cls[0])
-                        class_name = self.model.names[class_id].lower()
-                        
-                        # Get confidence
-                        confidence = float(box.conf[0])
-                        
-                        # Get bounding box coordinates (xyxy format)
-                        bbox_xyxy = box.xyxy[0].tolist()
-                        # Convert to [x, y, width, height] format
-                        bbox = [
-                            bbox_xyxy[0],  # x
-                            bbox_xyxy[1],  # y
-                            bbox_xyxy[2] - bbox_xyxy[0],  # width
-                            bbox_xyxy[3] - bbox_xyxy[1]   # height
-                        ]
-                        
-                        # Only include objects with reasonable confidence
-                        # Medium model typically has better confidence scores, so we can be more selective
-                        if confidence > 0.4:
-                            detected_objects.append(DetectedObject(
-                                name=class_name,
-                                confidence=confidence,
-                                bbox=bbox
-                            ))
-            
-            logger.info(f"Detected {len(detected_objects)} objects in {image_path}")
-            return detected_objects
-            
-        except Exception as e:
-            logger.error(f"Error detecting objects in {image_path}: {str(e)}")
-            raise RuntimeError(f"Object detection failed: {str(e)}")
-    
-    def filter_relevant_objects(self, detections: List[DetectedObject], requirements: List[str]) -> List[DetectedObject]:
-        """
-        Filter detections to only include objects from requirements list
-        
-        Args:
-            detections: List of all detected objects
-            requirements: List of required object names
-            
-        Returns:
-            List of DetectedObject instances that match requirements
-        """
-        try:
-            # Normalize requirement names for matching
-            normalized_requirements = [req.lower().strip() for req in requirements]
-            
-            relevant_detections = []
-            
-            for detection in detections:
-                # Check if detected object matches any requirement
-                for requirement in normalized_requirements:
-                    if self._objects_match(detection.name, requirement):
-                        relevant_detections.append(detection)
-                        break
-            
-            logger.info(f"Filtered {len(relevant_detections)} relevant objects from {len(detections)} total detections")
-            return relevant_detections
-            
-        except Exception as e:
-            logger.error(f"Error filtering relevant objects: {str(e)}")
-            return detections  # Return all detections if filtering fails
-    
-    def _objects_match(self, detected_name: str, required_name: str) -> bool:
-        """
-        Check if a detected object matches a required object name
-        
-        Args:
-            detected_name: Name from YOLO detection
-            required_name: Name from requirements list
-            
-        Returns:
-            True if objects match, False otherwise
-        """
-        # Direct match
-        if detected_name == required_name:
-            return True
-        
-        # Handle common synonyms and variations
-        synonyms = {
-            'sofa': ['couch', 'sofa'],
-            'couch': ['couch', 'sofa'],
-            'tv': ['tv', 'television'],
-            'television': ['tv', 'television'],
-            'dining table': ['table', 'dining table'],
-            'table': ['table', 'dining table'],
-            'chair': ['chair', 'seat'],
-            'seat': ['chair', 'seat'],
-            'bed': ['bed', 'bedroom'],
-            'light': ['lamp', 'light'],
-            'lamp': ['lamp', 'light'],
-            'fan': ['fan', 'ceiling fan'],
-            'window': ['window'],  # YOLO doesn't detect windows well, but we include it
-        }
-        
-        # Check if either name has synonyms that match the other
-        for synonym_group in synonyms.values():
-            if detected_name in synonym_group and required_name in synonym_group:
-                return True
-        
-        # Partial matching for compound names
-        if required_name in detected_name or detected_name in required_name:
-            return True
-        
-        return False
-    
-    def get_supported_objects(self) -> List[str]:
-        """
-        Get list of objects that can be detected by the model
-        
-        Returns:
-            List of supported object names
-        """
-        return list(self.relevant_objects)
\ No newline at end of file
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+from ultralytics import YOLO
+from ultralytics.data.augment import LetterBox
+from ultralytics.engine.results import Boxes
+from ultralytics.utils.ops import scale_boxes
+import cv2
+from PIL import Image
+import numpy as np
+from pathlib import Path
+import torch
+import torchvision
+from torchvision.io import ImageReadMode
+from app.services.francesco_classes import FRANCESCO_CLASSES, FURNITURE_OBJECTS
+
+logger = logging.getLogger(__name__)
+
+try:
+    from ultralytics.utils.nms import non_max_suppression
+except ImportError:
+    # Ultralytics < 8.3 keeps NMS in ops
+    from ultralytics.utils.ops import non_max_suppression
+
+try:
+    from ultralytics.nn.tasks import DetectionModel
+    # PyTorch 2.6+ loads checkpoints with weights_only=True; allow YOLO's model class once
+    torch.serialization.add_safe_globals([DetectionModel])
+except (ImportError, AttributeError):
+    # Older PyTorch loads full pickles by default
+    pass
+
+# Handle common synonyms and variations
+SYNONYM_GROUPS = (
+    ('couch', 'sofa'),
+    ('tv', 'television'),
+    ('table', 'dining table'),
+    ('chair', 'seat'),
+    ('bed', 'bedroom'),
+    ('lamp', 'light'),
+    ('fan', 'ceiling fan'),
+    ('window',),  # YOLO doesn't detect windows well, but we include it
+)
+
+def _build_aliases(groups) -> Dict[str, frozenset]:
+    """Map every name to all names it shares a synonym group with"""
+    aliases: Dict[str, frozenset] = {}
+    for group in groups:
+        for name in group:
+            aliases[name] = aliases.get(name, frozenset()) | frozenset(group)
+    return aliases
+
+OBJECT_ALIASES = _build_aliases(SYNONYM_GROUPS)
+
+JPEG_SUFFIXES = frozenset({".jpg", ".jpeg"})
+
+def letterbox_tensor(image: torch.Tensor, size: int, pad_value: int = 114) -> torch.Tensor:
+    """Resize and pad a CHW uint8 image to size x size the way Ultralytics' LetterBox does"""
+    height, width = image.shape[1:]
+    ratio = min(size / height, size / width)
+    new_height, new_width = round(height * ratio), round(width * ratio)
+    if (new_height, new_width) != (height, width):
+        resized = torch.nn.functional.interpolate(
+            image[None].float(), size=(new_height, new_width), mode="bilinear", align_corners=False
+        )
+        image = resized[0].round().clamp(0, 255).to(torch.uint8)
+    
+    pad_height, pad_width = (size - new_height) / 2, (size - new_width) / 2
+    top, bottom = round(pad_height - 0.1), round(pad_height + 0.1)
+    left, right = round(pad_width - 0.1), round(pad_width + 0.1)
+    return torch.nn.functional.pad(image, (left, right, top, bottom), value=pad_value)
+
+class GraphResult(NamedTuple):
+    """Minimal stand-in for an Ultralytics Results built from CUDA Graph output"""
+    boxes: Boxes
+    orig_shape: Tuple[int, int]
+
+@dataclass(slots=True)
+class DetectedObject:
+    # Created per box for every image in a batch; keep instances small
+    name: str
+    confidence: float
+    bbox: List[float]  # [x, y, width, height]
+
+class DetectionService:
+    # YOLO class names that are relevant for construction/interior projects
+    relevant_objects = frozenset({
+        'chair', 'couch', 'bed', 'dining table', 'toilet', 'tv', 'laptop',
+        'mouse', 'remote', 'keyboard', 'cell phone', 'microwave', 'oven',
+        'toaster', 'sink', 'refrigerator', 'book', 'clock', 'vase',
+        'scissors', 'teddy bear', 'hair drier', 'toothbrush', 'bottle',
+        'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana',
+        'apple', 'sandwich', 'orange', 'broccoli', 'carrot', 'hot dog',
+        'pizza', 'donut', 'cake', 'potted plant', 'sofa'
+    })
+    # Classes of the Francesco furniture model (see integrate_francesco_model.py)
+    francesco_classes = FRANCESCO_CLASSES
+    furniture_objects = FURNITURE_OBJECTS
+    # Detections at or below this confidence are dropped inside NMS
+    confidence_threshold = 0.4
+    
+    def __init__(self):
+        from app.config import settings
+        
+        self.model = None
+        # Ultralytics predictors are not thread-safe; a single worker thread
+        # serializes inference and keeps the model's device context warm
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yolo-inference")
+        self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # FP16 inference on GPU; ignored by CPU inference and prebuilt engines
+        self._half = self._device.type == "cuda"
+        # On GPU, letterbox and stack batches on the loader thread so the
+        # inference thread only copies a pinned tensor and runs the model
+        self._preprocess_in_loader = self._device.type == "cuda"
+        # Decode JPEGs with nvJPEG straight into device memory when available
+        self._gpu_decode = self._device.type == "cuda"
+        # Private stream for inference, so device-side decoding on the loader
+        # thread (default stream) can overlap with the model
+        self._stream = torch.cuda.Stream() if self._device.type == "cuda" else None
+        self._cpu_bfloat16 = self._device.type == "cpu" and settings.cpu_bfloat16
+        if self._device.type == "cuda":
+            # Allow TF32 tensor cores for any float32 matmuls left in the model
+            torch.set_float32_matmul_precision("high")
+            # Input size is fixed, so let cuDNN autotune each conv once per batch shape
+            torch.backends.cudnn.benchmark = True
+        # CUDA Graph of the forward pass, captured by warmup() when enabled
+        self._tensorrt = False
+        self._graph = None
+        self._graph_input = None
+        self._graph_output = None
+        self._load_model()
+    
+    def _load_model(self):
+        """Load YOLOv8 model based on configuration"""
+        try:
+            from app.config import settings
+            model_name = settings.yolo_model
+            
+            # Validate model name
+            valid_models = [
+                'yolov8n.pt',    # Nano - fastest, lowest accuracy
+                'yolov8s.pt',    # Small - good balance
+                'yolov8m.pt',    # Medium - better accuracy
+                'yolov8l.pt',    # Large - high accuracy
+                'yolov8x.pt',    # Extra Large - highest accuracy
+                'yolov8n-seg.pt', # Nano segmentation
+                'yolov8s-seg.pt', # Small segmentation
+                'yolov8m-seg.pt', # Medium segmentation
+                'yolov8l-seg.pt', # Large segmentation
+                'yolov8x-seg.pt'  # Extra Large segmentation
+            ]
+            
+            if model_name not in valid_models:
+                logger.warning(f"Invalid model name '{model_name}', falling back to yolov8n.pt")
+                model_name = 'yolov8n.pt'
+            
+            self.model = YOLO(model_name)
+            
+            # Swap in a TensorRT engine when a GPU is available
+            if settings.use_tensorrt and torch.cuda.is_available():
+                try:
+                    self.model = self._load_tensorrt_engine(model_name)
+                    self._tensorrt = True
+                except Exception as e:
+                    logger.warning(f"TensorRT engine unavailable, using PyTorch model: {str(e)}")
+            
+            # Log model details
+            model_details = {
+                'yolov8n.pt': 'Nano (~3.2M params, fastest)',
+                'yolov8s.pt': 'Small (~11.2M params, fast)', 
+                'yolov8m.pt': 'Medium (~25.9M params, balanced accuracy/speed)',
+                'yolov8l.pt': 'Large (~43.7M params, high accuracy)',
+                'yolov8x.pt': 'Extra Large (~68.2M params, highest accuracy)'
+            }
+            
+            detail = model_details.get(model_name, 'Custom model')
+            logger.info(f"YOLOv8 model '{model_name}' loaded successfully - {detail}")
+            
+        except Exception as e:
+            logger.error(f"Failed to load YOLOv8 model: {str(e)}")
+            raise RuntimeError(f"Could not initialize detection model: {str(e)}")
+    
+    def _load_tensorrt_engine(self, model_name: str):
+        """Load the TensorRT engine for a model, exporting it on first use"""
+        from app.config import settings
+        
+        int8 = settings.tensorrt_int8 and bool(settings.tensorrt_calibration_data)
+        if settings.tensorrt_int8 and not int8:
+            logger.warning("INT8 requested without calibration data, using an FP16 engine instead")
+        
+        # Engines are only valid for the shapes and precision they were built
+        # with, so key the cached file on all of them
+        precision = "int8" if int8 else "fp16"
+        engine_path = Path(settings.tensorrt_cache_dir) / (
+            f"{Path(model_name).stem}-{settings.image_size}-b{settings.batch_size}-{precision}.engine"
+        )
+        if not engine_path.exists():
+            logger.info(f"Exporting TensorRT engine for '{model_name}' (this can take several minutes)")
+            exported = Path(self.model.export(
+                format="engine",
+                imgsz=settings.image_size,
+                half=True,
+                int8=int8,
+                dynamic=True,
+                batch=settings.batch_size,
+                workspace=4,
+                data=settings.tensorrt_calibration_data or None
+            ))
+            engine_path.parent.mkdir(parents=True, exist_ok=True)
+            exported.replace(engine_path)
+        
+        model = YOLO(str(engine_path), task="detect")
+        logger.info(f"Loaded TensorRT engine {engine_path}")
+        return model
+    
+    async def detect_objects(self, image_path: str, requirements: Optional[List[str]] = None) -> List[DetectedObject]:
+        """
+        Process image and return detected objects with confidence scores
+        
+        Args:
+            image_path: Path to the image file
+            requirements: Optional required object names; other classes are pruned in NMS
+            
+        Returns:
+            List of DetectedObject instances
+        """
+        detections = await self.detect_objects_batch([image_path], requirements)
+        return detections[0]
+    
+    async def detect_objects_batch(
+        self,
+        image_paths: List[str],
+        requirements: Optional[List[str]] = None
+    ) -> List[List[DetectedObject]]:
+        """
+        Process several images with batched model calls
+        
+        Images for the next batch are decoded while the current batch runs
+        on the model, so disk I/O overlaps with inference.
+        
+        Args:
+            image_paths: Paths to the image files
+            requirements: Optional required object names; other classes are pruned in NMS
+        
+        Returns:
+            One list of DetectedObject instances per image, in input order
+        """
+        next_images = None
+        try:
+            from app.config import settings
+            
+            for image_path in image_paths:
+                if not os.path.exists(image_path):
+                    raise FileNotFoundError(f"Image file not found: {image_path}")
+            
+            classes = self._class_ids_for(requirements) if requirements else None
+            
+            batch_size = max(1, settings.batch_size)
+            batches = [image_paths[start:start + batch_size] for start in range(0, len(image_paths), batch_size)]
+            
+            detections = []
+            for index, batch in enumerate(batches):
+                images, original_shapes = await (next_images or self._read_images(batch))
+                next_images = None
+                if index + 1 < len(batches):
+                    next_images = asyncio.ensure_future(self._read_images(batches[index + 1]))
+                
+                # Ultralytics accepts a list of images and returns one result per image
+                results = await self._predict(images, classes)
+                detections.extend(
+                    self._parse_result(result, original_shape)
+                    for result, original_shape in zip(results, original_shapes)
+                )
+            
+            logger.info(f"Detected {sum(len(d) for d in detections)} objects in {len(image_paths)} images")
+            return detections
+        
+        except Exception as e:
+            if next_images is not None:
+                next_images.cancel()
+            logger.error(f"Error detecting objects in batch of {len(image_paths)} images: {str(e)}")
+            raise RuntimeError(f"Object detection failed: {str(e)}")
+    
+    def _class_ids_for(self, requirements: List[str]) -> Optional[List[int]]:
+        """
+        Map requirement names onto the model's class ids, using the same
+        matching as filter_relevant_objects, so NMS can skip every other class
+        """
+        normalized_requirements = set(req.lower().strip() for req in requirements) - {""}
+        class_ids = [
+            class_id for class_id, name in self.model.names.items()
+            if any(self._objects_match(name.lower(), requirement) for requirement in normalized_requirements)
+        ]
+        # An empty list would prune everything; keep all classes instead
+        return class_ids or None
+    
+    async def _read_images(self, image_paths: List[str]) -> Tuple[Any, List[Optional[Tuple[int, int]]]]:
+        """
+        Decode (and on GPU, preprocess) images off the event loop
+        
+        Returns the model input and, for preprocessed batches, each image's
+        original (height, width) so boxes can be mapped back onto it.
+        """
+        if self._preprocess_in_loader:
+            return await asyncio.to_thread(self._prepare_tensor_batch, image_paths)
+        images = await asyncio.to_thread(self._decode_images, image_paths)
+        return images, [None] * len(images)
+    
+    @staticmethod
+    def _decode_images(image_paths: List[str]) -> List[np.ndarray]:
+        """Read images as BGR arrays, the layout Ultralytics expects"""
+        images = []
+        for image_path in image_paths:
+            image = cv2.imread(image_path)
+            if image is None:
+                raise ValueError(f"Could not decode image: {image_path}")
+            images.append(image)
+        return images
+    
+    def _prepare_tensor_batch(self, image_paths: List[str]) -> Tuple[torch.Tensor, List[Tuple[int, int]]]:
+        """Letterbox images into one uint8 RGB BCHW tensor, pinned for async copies"""
+        from app.config import settings
+        
+        if self._gpu_decode and all(Path(path).suffix.lower() in JPEG_SUFFIXES for path in image_paths):
+            try:
+                return self._decode_batch_on_device(image_paths)
+            except RuntimeError as e:
+                # nvJPEG is missing or rejected the input; stick to CPU decoding from now on
+                logger.warning(f"GPU JPEG decoding unavailable, preprocessing on CPU: {str(e)}")
+                self._gpu_decode = False
+        
+        images = self._decode_images(image_paths)
+        letterbox = LetterBox(new_shape=(settings.image_size, settings.image_size), auto=False)
+        batch = np.stack([letterbox(image=image) for image in images])
+        batch = np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2))  # BGR HWC -> RGB CHW
+        
+        tensor = torch.from_numpy(batch)
+        if self._device.type == "cuda":
+            tensor = tensor.pin_memory()
+        return tensor, [image.shape[:2] for image in images]
+    
+    def _decode_batch_on_device(self, image_paths: List[str]) -> Tuple[torch.Tensor, List[Tuple[int, int]]]:
+        """Decode and letterbox JPEGs on the device; only reading bytes stays on the CPU"""
+        from app.config import settings
+        
+        data = [torchvision.io.read_file(path) for path in image_paths]
+        images = torchvision.io.decode_jpeg(
+            data,
+            mode=ImageReadMode.RGB,
+            device=self._device,
+            apply_exif_orientation=True  # cv2.imread honours EXIF orientation too
+        )
+        batch = torch.stack([letterbox_tensor(image, settings.image_size) for image in images])
+        return batch, [tuple(image.shape[1:]) for image in images]
+    
+    async def _predict(self, source, classes: Optional[List[int]] = None):
+        """Run the model on an image or list of images on the inference thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_model, source, classes)
+    
+    def _run_model(self, source, classes: Optional[List[int]] = None):
+        """Call the model, moving preprocessed tensors to the device first"""
+        # Grad mode is thread-local, so it has to be switched off on this thread
+        with torch.inference_mode():
+            if self._stream is None:
+                return self._call_model(source, classes)
+            
+            with torch.cuda.stream(self._stream):
+                # Start only after the loader's decode work queued on the default stream
+                self._stream.wait_stream(torch.cuda.default_stream(self._device))
+                results = self._call_model(source, classes)
+            # Results are read on other threads, which use the default stream
+            self._stream.synchronize()
+            return results
+    
+    def _call_model(self, source, classes: Optional[List[int]] = None):
+        from app.config import settings
+        
+        if isinstance(source, torch.Tensor):
+            source = source.to(self._device, non_blocking=True)
+            source = (source.half() if self._half else source.float()) / 255
+            if self._graph is not None:
+                return self._replay_graph(source, classes)
+        with torch.autocast("cpu", dtype=torch.bfloat16, enabled=self._cpu_bfloat16):
+            return self.model(
+                source,
+                imgsz=settings.image_size,
+                half=self._half,
+                classes=classes,
+                conf=self.confidence_threshold,
+                verbose=False
+            )
+    
+    def warmup(self):
+        """
+        Run one dummy prediction so the first upload doesn't pay for predictor
+        setup, Conv+BN fusion and kernel autotuning
+        """
+        from app.config import settings
+        
+        try:
+            image = np.zeros((settings.image_size, settings.image_size, 3), dtype=np.uint8)
+            self._run_model([image])
+            logger.info("Detection model warmed up")
+        except Exception as e:
+            logger.warning(f"Detection model warmup failed: {str(e)}")
+            return
+        
+        if settings.enable_cuda_graph and self._device.type == "cuda" and not self._tensorrt:
+            try:
+                self._capture_graph()
+                logger.info(f"Captured CUDA Graph for batches of {settings.batch_size}")
+            except Exception as e:
+                self._graph = None
+                logger.warning(f"CUDA Graph capture failed, using eager inference: {str(e)}")
+    
+    def _capture_graph(self):
+        """
+        Capture the forward pass for a fixed (batch_size, image_size) input so
+        each batch replays one graph instead of launching every kernel
+        """
+        from app.config import settings
+        
+        # The predictor's backend is already fused and in FP16 after warmup
+        backend = self.model.predictor.model
+        size = settings.image_size
+        static_input = torch.zeros(
+            (max(1, settings.batch_size), 3, size, size),
+            dtype=torch.half if self._half else torch.float,
+            device=self._device
+        )
+        
+        with torch.inference_mode():
+            # Warm up on a side stream so capture doesn't record lazy initialization
+            side_stream = torch.cuda.Stream()
+            side_stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(side_stream):
+                for _ in range(3):
+                    backend(static_input)
+            torch.cuda.current_stream().wait_stream(side_stream)
+            
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph):
+                output = backend(static_input)
+        
+        self._graph_input = static_input
+        self._graph_output = output[0] if isinstance(output, (list, tuple)) else output
+        self._graph = graph
+    
+    def _replay_graph(self, batch: torch.Tensor, classes: Optional[List[int]] = None) -> List[GraphResult]:
+        """Run a normalized batch through the captured graph and apply NMS"""
+        count = len(batch)
+        size = tuple(self._graph_input.shape[2:])
+        
+        with torch.inference_mode():
+            # Short batches are zero-padded up to the captured shape, then masked out
+            self._graph_input[:count].copy_(batch)
+            self._graph_input[count:].zero_()
+            self._graph.replay()
+            # Later replays overwrite the static output
+            predictions = self._graph_output[:count].clone()
+            
+            args = self.model.predictor.args
+            detections = non_max_suppression(
+                predictions,
+                self.confidence_threshold,
+                args.iou,
+                classes,
+                args.agnostic_nms,
+                max_det=args.max_det
+            )
+        return [GraphResult(Boxes(det[:, :6], size), size) for det in detections]
+    
+    def shutdown(self):
+        """Stop the inference thread once pending predictions finish"""
+        self._executor.shutdown(wait=True)
+    
+    def _parse_result(self, result, original_shape: Optional[Tuple[int, int]] = None) -> List[DetectedObject]:
+        """Convert a single Ultralytics result into DetectedObject instances"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+        
+        # One device-to-host copy of the (N, 6) box tensor: xyxy, conf, cls
+        data = boxes.data.cpu().numpy()
+        class_ids = data[:, -1].astype(np.int32)
+        confidences = data[:, -2]
+        bbox_xyxy = data[:, :4]
+        if original_shape is not None:
+            # Boxes from a letterboxed tensor are in model input coordinates
+            # (scale_boxes works in place, so leave the result's own array alone)
+            bbox_xyxy = scale_boxes(result.orig_shape, bbox_xyxy.copy(), original_shape)
+        
+        # Only include objects with reasonable confidence (NMS applies the same
+        # threshold; this guards prebuilt engines that ignore it)
+        keep = confidences > self.confidence_threshold
+        class_ids, confidences, bbox_xyxy = class_ids[keep], confidences[keep], bbox_xyxy[keep]
+        
+        # Convert xyxy to [x, y, width, height] format
+        bboxes = bbox_xyxy.copy()
+        bboxes[:, 2:] -= bbox_xyxy[:, :2]
+        
+        names = self.model.names
+        return [
+            DetectedObject(name=names[class_id].lower(), confidence=confidence, bbox=bbox)
+            for class_id, confidence, bbox in zip(class_ids.tolist(), confidences.tolist(), bboxes.tolist())
+        ]
+    
+    def filter_relevant_objects(self, detections: List[DetectedObject], requirements: List[str]) -> List[DetectedObject]:
+        """
+        Filter detections to only include objects from requirements list
+        
+        Args:
+            detections: List of all detected objects
+            requirements: List of required object names
+            
+        Returns:
+            List of DetectedObject instances that match requirements
+        """
+        if not detections or not requirements:
+            return []
+        
+        # Normalize requirement names for matching
+        normalized_requirements = set(req.lower().strip() for req in requirements) - {""}
+        if not normalized_requirements:
+            return []
+        
+        # Detections repeat a handful of class names; match each name once
+        detected_names = set(detection.name for detection in detections)
+        matched_names = set(
+            name for name in detected_names
+            if any(self._objects_match(name, requirement) for requirement in normalized_requirements)
+        )
+        
+        if not matched_names:
+            relevant_detections = []
+        elif len(matched_names) == len(detected_names):
+            relevant_detections = detections
+        else:
+            relevant_detections = [detection for detection in detections if detection.name in matched_names]
+        
+        logger.info(f"Filtered {len(relevant_detections)} relevant objects from {len(detections)} total detections")
+        return relevant_detections
+    
+    def _objects_match(self, detected_name: str, required_name: str) -> bool:
+        """
+        Check if a detected object matches a required object name
+        
+        Args:
+            detected_name: Name from YOLO detection
+            required_name: Name from requirements list
+            
+        Returns:
+            True if objects match, False otherwise
+        """
+        # Direct match
+        if detected_name == required_name:
+            return True
+        
+        # Check if the names share a synonym group
+        if required_name in OBJECT_ALIASES.get(detected_name, ()):
+            return True
+        
+        # Partial matching for compound names
+        if required_name in detected_name or detected_name in required_name:
+            return True
+        
+        return False
+    
+    def get_supported_objects(self) -> List[str]:
+        """
+        Get list of objects that can be detected by the model
+        
+        Returns:
+            List of supported object names
+        """
+        return list(self.relevant_objects)
+
+# Shared instance so the model is loaded once per process, not per request
+_detection_service: Optional[DetectionService] = None
+_detection_service_lock = threading.Lock()
+
+def get_detection_service() -> DetectionService:
+    """Return the process-wide detection service, loading the model on first use"""
+    global _detection_service
+    if _detection_service is None:
+        with _detection_service_lock:
+            if _detection_service is None:
+                _detection_service = DetectionService()
+    return _detection_service
+
+def shutdown_detection_service():
+    """Release the shared detection service's inference thread, if it was started"""
+    if _detection_service is not None:
+        _detection_service.shutdown()
\ No newline at end of file
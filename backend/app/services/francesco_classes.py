@@ -0,0 +1,13 @@
+# Francesco furniture dataset classes
+FRANCESCO_CLASSES = {
+    0: "furniture",
+    1: "chair",
+    2: "sofa",
+    3: "table"
+}
+
+# Enhanced furniture detection for Francesco model
+FURNITURE_OBJECTS = frozenset({
+    'chair', 'sofa', 'table', 'furniture', 'couch', 'dining table',
+    'bed', 'desk', 'cabinet', 'shelf', 'dresser', 'nightstand'
+})
\ No newline at end of file
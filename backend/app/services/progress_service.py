@@ -1,125 +1,179 @@
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from app.models.project import Project, Requirement, Detection
-from app.schemas.project import ProgressResponse, RequirementMatch, DetectionSummary
-from typing import Optional, Dict, List
-import logging
-from collections import defaultdict
-
-logger = logging.getLogger(__name__)
-
-class ProgressService:
-    """Service class for progress comparison and calculation"""
-    
-    def __init__(self, db: Session):
-        self.db = db
-    
-    async def calculate_project_progress(self, project_id: str) -> Optional[ProgressResponse]:
-        """Calculate progress for a project by comparing requirements against detections"""
-        try:
-            # Get project with requirements and detections
-            project = self.db.query(Project).filter(Project.id == project_id).first()
-            
-            if not project:
-                logger.warning(f"Project {project_id} not found")
-                return None
-            
-            # Get requirements and detections
-            requirements = [req.object_name for req in project.requirements]
-            detections = project.detections
-            
-            if not requirements:
-                logger.warning(f"No requirements found for project {project_id}")
-                return ProgressResponse(
-                    project_id=project_id,
-                    completion_percentage=0.0,
-                    requirement_matches=[],
-                    detection_summary=DetectionSummary(
-                        total_objects_detected=0,
-                        unique_objects=[],
-                        average_confidence=0.0
-                    )
-                )
-            
-            # Calculate requirement matches
-            requirement_matches = self._calculate_requirement_matches(requirements, detections)
-            
-            # Calculate completion percentage
-            completion_percentage = self._calculate_completion_percentage(requirement_matches)
-            
-            # Generate detection summary
-            detection_summary = self._generate_detection_summary(detections)
-            
-            return ProgressResponse(
-                project_id=project_id,
-                completion_percentage=completion_percentage,
-                requirement_matches=requirement_matches,
-                detection_summary=detection_summary
-            )
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error calculating progress for project {project_id}: {str(e)}")
-            raise Exception("Failed to calculate progress due to database error")
-        except Exception as e:
-            logger.error(f"Unexpected error calculating progress for project {project_id}: {str(e)}")
-            raise Exception("Failed to calculate progress")
-    
-    def _calculate_requirement_matches(self, requirements: List[str], detections: List[Detection]) -> List[RequirementMatch]:
-        """Calculate matches between requirements and detections"""
-        # Group detections by object name with confidence scores
-        detection_groups = defaultdict(list)
-        for detection in detections:
-            detection_groups[detection.object_name.lower()].append(detection.confidence)
-        
-        requirement_matches = []
-        
-        for requirement in requirements:
-            req_lower = requirement.lower()
-            
-            if req_lower in detection_groups:
-                confidences = detection_groups[req_lower]
-                requirement_matches.append(RequirementMatch(
-                    requirement=requirement,
-                    detected=True,
-                    confidence=max(confidences),  # Use highest confidence
-                    count=len(confidences)
-                ))
-            else:
-                requirement_matches.append(RequirementMatch(
-                    requirement=requirement,
-                    detected=False,
-                    confidence=None,
-                    count=0
-                ))
-        
-        return requirement_matches
-    
-    def _calculate_completion_percentage(self, requirement_matches: List[RequirementMatch]) -> float:
-        """Calculate completion percentage based on requirement matches"""
-        if not requirement_matches:
-            return 0.0
-        
-        detected_count = sum(1 for match in requirement_matches if match.detected)
-        total_count = len(requirement_matches)
-        
-        return round((detected_count / total_count) * 100, 2)
-    
-    def _generate_detection_summary(self, detections: List[Detection]) -> DetectionSummary:
-        """Generate summary of all detections"""
-        if not detections:
-            return DetectionSummary(
-                total_objects_detected=0,
-                unique_objects=[],
-                average_confidence=0.0
-            )
-        
-        # Get unique objects and calculate average confidence
-        unique_objects = list(set(detection.object_name for detection in detections))
-        total_confidence = sum(detection.confidence for detection in detections)
-        average_confidence = round(total_confidence / len(detections), 3)
-        
-        return DetectionSummary(
-            total_objects_detected=len(detections),
-            unique_objects=sorted(unique_objects),
-            average_confidence=average_confidence
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.project import Project, Requirement, Detection
+from app.schemas.project import ProgressResponse, RequirementMatch, DetectionSummary
+from app.services.response_cache import response_cache
+from typing import Optional, Dict, List, NamedTuple, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ObjectStats(NamedTuple):
+    """Aggregated detections of one object name within a project"""
+    object_name: str
+    count: int
+    max_confidence: float
+    total_confidence: float
+
+class ProgressService:
+    """Service class for progress comparison and calculation"""
+    
+    __slots__ = ("db",)
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def calculate_project_progress(self, project_id: str) -> Optional[ProgressResponse]:
+        """Calculate progress for a project by comparing requirements against detections"""
+        try:
+            # Serve repeated polls from cache until the project's detections change
+            cache_key = await response_cache.make_key(self.db, "progress", project_id)
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            # Get requirements
+            requirements = await self._get_requirements(project_id)
+            
+            if requirements is None:
+                logger.warning(f"Project {project_id} not found")
+                return None
+            
+            if not requirements:
+                logger.warning(f"No requirements found for project {project_id}")
+                progress = ProgressResponse(
+                    project_id=project_id,
+                    completion_percentage=0.0,
+                    requirement_matches=[],
+                    detection_summary=DetectionSummary(
+                        total_objects_detected=0,
+                        unique_objects=[],
+                        average_confidence=0.0
+                    )
+                )
+                response_cache.set(cache_key, progress)
+                return progress
+            
+            # Aggregate detections per object name in the database
+            object_stats = await self._get_object_stats(project_id)
+            
+            # Calculate requirement matches
+            requirement_matches = self._calculate_requirement_matches(requirements, object_stats)
+            
+            # Calculate completion percentage
+            completion_percentage = self._calculate_completion_percentage(requirement_matches)
+            
+            # Generate detection summary
+            detection_summary = self._generate_detection_summary(object_stats)
+            
+            progress = ProgressResponse(
+                project_id=project_id,
+                completion_percentage=completion_percentage,
+                requirement_matches=requirement_matches,
+                detection_summary=detection_summary
+            )
+            response_cache.set(cache_key, progress)
+            return progress
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error calculating progress for project {project_id}: {str(e)}")
+            raise Exception("Failed to calculate progress due to database error")
+        except Exception as e:
+            logger.error(f"Unexpected error calculating progress for project {project_id}: {str(e)}")
+            raise Exception("Failed to calculate progress")
+    
+    async def _get_requirements(self, project_id: str) -> Optional[List[str]]:
+        """Fetch requirement names in one round-trip; None if the project does not exist"""
+        # The outer join keeps one row (with a NULL name) for a project without requirements
+        result = await self.db.execute(
+            select(Requirement.object_name)
+            .select_from(Project)
+            .outerjoin(Requirement, Requirement.project_id == Project.id)
+            .where(Project.id == project_id)
+        )
+        rows = result.all()
+        if not rows:
+            return None
+        return [object_name for (object_name,) in rows if object_name is not None]
+    
+    async def _get_object_stats(self, project_id: str) -> List[ObjectStats]:
+        """Count detections and aggregate confidence per object name"""
+        result = await self.db.execute(
+            select(
+                Detection.object_name,
+                func.count(),
+                func.max(Detection.confidence),
+                func.sum(Detection.confidence)
+            )
+            .where(Detection.project_id == project_id)
+            .group_by(Detection.object_name)
+        )
+        return [ObjectStats(*row) for row in result.all()]
+    
+    def _calculate_requirement_matches(self, requirements: List[str], object_stats: List[ObjectStats]) -> List[RequirementMatch]:
+        """Calculate matches between requirements and aggregated detections"""
+        # The database already grouped detections by name; only merge names
+        # that differ in case, keeping (count, highest confidence) per name
+        detection_groups: Dict[str, Tuple[int, float]] = {}
+        for object_name, count, max_confidence, _ in object_stats:
+            key = object_name.lower()
+            previous = detection_groups.get(key)
+            if previous is not None:
+                count += previous[0]
+                max_confidence = max(max_confidence, previous[1])
+            detection_groups[key] = (count, max_confidence)
+        
+        requirement_matches = []
+        
+        for requirement in requirements:
+            group = detection_groups.get(requirement.lower())
+            
+            if group is not None:
+                count, max_confidence = group
+                requirement_matches.append(RequirementMatch(
+                    requirement=requirement,
+                    detected=True,
+                    confidence=max_confidence,  # Use highest confidence
+                    count=count
+                ))
+            else:
+                requirement_matches.append(RequirementMatch(
+                    requirement=requirement,
+                    detected=False,
+                    confidence=None,
+                    count=0
+                ))
+        
+        return requirement_matches
+    
+    def _calculate_completion_percentage(self, requirement_matches: List[RequirementMatch]) -> float:
+        """Calculate completion percentage based on requirement matches"""
+        if not requirement_matches:
+            return 0.0
+        
+        detected_count = sum(1 for match in requirement_matches if match.detected)
+        total_count = len(requirement_matches)
+        
+        return round((detected_count / total_count) * 100, 2)
+    
+    def _generate_detection_summary(self, object_stats: List[ObjectStats]) -> DetectionSummary:
+        """Generate summary of all detections"""
+        total_detections = sum(stats.count for stats in object_stats)
+        if not total_detections:
+            return DetectionSummary(
+                total_objects_detected=0,
+                unique_objects=[],
+                average_confidence=0.0
+            )
+        
+        # Get unique objects and calculate average confidence
+        unique_objects = [stats.object_name for stats in object_stats]
+        total_confidence = sum(stats.total_confidence for stats in object_stats)
+        average_confidence = round(total_confidence / total_detections, 3)
+        
+        return DetectionSummary(
+            total_objects_detected=total_detections,
+            unique_objects=sorted(unique_objects),
+            average_confidence=average_confidence
         )
\ No newline at end of file
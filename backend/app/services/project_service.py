@@ -1,102 +1,115 @@
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from app.models.project import Project, Requirement
-from app.schemas.project import ProjectCreateRequest, ProjectResponse
-from typing import Optional, List
-import logging
-
-logger = logging.getLogger(__name__)
-
-class ProjectService:
-    """Service class for project-related operations"""
-    
-    def __init__(self, db: Session):
-        self.db = db
-    
-    async def create_project(self, project_data: ProjectCreateRequest) -> ProjectResponse:
-        """Create a new project with requirements"""
-        try:
-            # Create project
-            project = Project(name=project_data.name)
-            self.db.add(project)
-            self.db.flush()  # Get the project ID without committing
-            
-            # Create requirements
-            requirements = []
-            for req_name in project_data.requirements:
-                requirement = Requirement(
-                    project_id=project.id,
-                    object_name=req_name.strip().lower()
-                )
-                requirements.append(requirement)
-                self.db.add(requirement)
-            
-            # Commit all changes
-            self.db.commit()
-            self.db.refresh(project)
-            
-            # Return response with requirements list
-            return ProjectResponse(
-                id=project.id,
-                name=project.name,
-                requirements=[req.object_name for req in requirements],
-                created_at=project.created_at
-            )
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error creating project: {str(e)}")
-            self.db.rollback()
-            raise Exception("Failed to create project due to database error")
-        except Exception as e:
-            logger.error(f"Unexpected error creating project: {str(e)}")
-            self.db.rollback()
-            raise Exception("Failed to create project")
-    
-    async def get_project(self, project_id: str) -> Optional[ProjectResponse]:
-        """Get a project by ID with its requirements"""
-        try:
-            project = self.db.query(Project).filter(Project.id == project_id).first()
-            
-            if not project:
-                return None
-            
-            # Get requirements for this project
-            requirements = [req.object_name for req in project.requirements]
-            
-            return ProjectResponse(
-                id=project.id,
-                name=project.name,
-                requirements=requirements,
-                created_at=project.created_at
-            )
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error retrieving project {project_id}: {str(e)}")
-            raise Exception("Failed to retrieve project due to database error")
-        except Exception as e:
-            logger.error(f"Unexpected error retrieving project {project_id}: {str(e)}")
-            raise Exception("Failed to retrieve project")
-    
-    async def get_all_projects(self) -> List[ProjectResponse]:
-        """Get all projects with their requirements"""
-        try:
-            projects = self.db.query(Project).all()
-            
-            result = []
-            for project in projects:
-                requirements = [req.object_name for req in project.requirements]
-                result.append(ProjectResponse(
-                    id=project.id,
-                    name=project.name,
-                    requirements=requirements,
-                    created_at=project.created_at
-                ))
-            
-            return result
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error retrieving all projects: {str(e)}")
-            raise Exception("Failed to retrieve projects due to database error")
-        except Exception as e:
-            logger.error(f"Unexpected error retrieving all projects: {str(e)}")
-            raise Exception("Failed to retrieve projects")
\ No newline at end of file
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.project import Project, Requirement
+from app.schemas.project import ProjectCreateRequest, ProjectResponse
+from typing import Optional, List
+from itertools import groupby
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class ProjectService:
+    """Service class for project-related operations"""
+    
+    __slots__ = ("db",)
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create_project(self, project_data: ProjectCreateRequest) -> ProjectResponse:
+        """Create a new project with requirements"""
+        try:
+            # Create project
+            project = Project(name=project_data.name)
+            self.db.add(project)
+            await self.db.flush()  # Get the project ID without committing
+            
+            # Create requirements in one executemany INSERT
+            requirements = [req_name.strip().lower() for req_name in project_data.requirements]
+            if requirements:
+                await self.db.execute(insert(Requirement), [
+                    {"id": str(uuid.uuid4()), "project_id": project.id, "object_name": object_name}
+                    for object_name in requirements
+                ])
+            
+            # Commit all changes
+            await self.db.commit()
+            await self.db.refresh(project)
+            
+            # Return response with requirements list
+            return ProjectResponse(
+                id=project.id,
+                name=project.name,
+                requirements=requirements,
+                created_at=project.created_at
+            )
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error creating project: {str(e)}")
+            await self.db.rollback()
+            raise Exception("Failed to create project due to database error")
+        except Exception as e:
+            logger.error(f"Unexpected error creating project: {str(e)}")
+            await self.db.rollback()
+            raise Exception("Failed to create project")
+    
+    async def get_project(self, project_id: str) -> Optional[ProjectResponse]:
+        """Get a project by ID with its requirements"""
+        try:
+            # Join requirements into the same round-trip as the project
+            rows = (await self.db.execute(
+                self._project_rows().where(Project.id == project_id)
+            )).all()
+            
+            if not rows:
+                return None
+            
+            return self._to_response(rows)
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving project {project_id}: {str(e)}")
+            raise Exception("Failed to retrieve project due to database error")
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving project {project_id}: {str(e)}")
+            raise Exception("Failed to retrieve project")
+    
+    async def get_all_projects(self) -> List[ProjectResponse]:
+        """Get all projects with their requirements"""
+        try:
+            rows = (await self.db.execute(
+                self._project_rows().order_by(Project.created_at, Project.id)
+            )).all()
+            
+            # Rows arrive grouped by project, one per requirement
+            return [
+                self._to_response(list(project_rows))
+                for _, project_rows in groupby(rows, key=lambda row: row.id)
+            ]
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving all projects: {str(e)}")
+            raise Exception("Failed to retrieve projects due to database error")
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving all projects: {str(e)}")
+            raise Exception("Failed to retrieve projects")
+    
+    @staticmethod
+    def _project_rows():
+        """Select plain project columns outer-joined to requirement names, skipping ORM objects"""
+        return (
+            select(Project.id, Project.name, Project.created_at, Requirement.object_name)
+            .outerjoin(Requirement, Requirement.project_id == Project.id)
+        )
+    
+    @staticmethod
+    def _to_response(rows) -> ProjectResponse:
+        """Build a project response from its joined rows"""
+        first = rows[0]
+        return ProjectResponse(
+            id=first.id,
+            name=first.name,
+            requirements=[row.object_name for row in rows if row.object_name is not None],
+            created_at=first.created_at
+        )
\ No newline at end of file
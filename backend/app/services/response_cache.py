@@ -0,0 +1,54 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cachetools import TTLCache
+from app.config import settings
+from app.models.project import Detection
+from typing import Any, Dict, Hashable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """Short-lived cache for per-project read endpoints"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+    
+    async def make_key(self, db: AsyncSession, endpoint: str, project_id: str) -> Hashable:
+        """
+        Build a cache key that changes whenever the project's detections change
+        
+        The detection count and latest timestamp (one indexed aggregate) cover
+        writes and deletes from other processes; the in-memory version covers
+        uploads handled by this one within the same second.
+        """
+        result = await db.execute(
+            select(func.count(), func.max(Detection.created_at)).where(Detection.project_id == project_id)
+        )
+        detection_state = result.one()
+        return (endpoint, project_id, self._versions.get(project_id, 0), detection_state)
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached response for a key, if still fresh"""
+        return self._cache.get(key)
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a response under a key"""
+        self._cache[key] = value
+    
+    def invalidate(self, project_id: str):
+        """Drop cached responses for a project after its detections change"""
+        self._versions[project_id] = self._versions.get(project_id, 0) + 1
+        logger.debug(f"Invalidated cached responses for project {project_id}")
+    
+    def clear(self):
+        """Remove all cached responses"""
+        self._cache.clear()
+        self._versions.clear()
+
+# Global response cache instance
+response_cache = ResponseCache(
+    maxsize=settings.response_cache_size,
+    ttl=settings.response_cache_ttl
+)
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""Test data shared across test modules"""
+import io
+from PIL import Image
+
+def _encode_minimal_jpeg() -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (1, 1)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+# A valid 1x1 JPEG, encoded once per session, for tests that never look at pixels
+MINIMAL_JPEG = _encode_minimal_jpeg()
\ No newline at end of file
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.database.connection import Base
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the whole test session instead of one per async test"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+def set_test_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """Skip the on-disk journal and fsyncs; the test database is thrown away"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+@pytest_asyncio.fixture(scope="session")
+async def sqlite_engine():
+    """One in-memory SQLite database with the full schema, shared by the whole session
+    
+    StaticPool hands every checkout the same connection, so the database lives
+    as long as the engine. An in-memory database is private to its process,
+    so each pytest-xdist worker already gets its own.
+    """
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    event.listen(engine.sync_engine, "connect", set_test_sqlite_pragmas)
+    
+    # Let SQLAlchemy emit BEGIN itself; the driver's implicit transactions
+    # would otherwise break the per-test SAVEPOINTs
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    yield engine
+    
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def session_factory(sqlite_engine):
+    """Open sessions inside one transaction that is rolled back after the test
+    
+    Commits made through these sessions only release a SAVEPOINT, so every test
+    starts from the empty schema without recreating it.
+    """
+    async with sqlite_engine.connect() as connection:
+        transaction = await connection.begin()
+        yield async_sessionmaker(
+            bind=connection,
+            class_=AsyncSession,
+            join_transaction_mode="create_savepoint",
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        await transaction.rollback()
\ No newline at end of file
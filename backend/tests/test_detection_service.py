@@ -1,185 +1,498 @@
-import pytest
-import os
-import tempfile
-from unittest.mock import Mock, patch, MagicMock
-from PIL import Image
-import numpy as np
-from app.services.detection_service import DetectionService, DetectedObject
-
-class TestDetectionService:
-    
-    @pytest.fixture
-    def detection_service(self):
-        """Create a detection service instance for testing"""
-        with patch('app.services.detection_service.YOLO') as mock_yolo:
-            mock_model = Mock()
-            mock_model.names = {0: 'chair', 1: 'table', 2: 'sofa'}
-            mock_yolo.return_value = mock_model
-            
-            service = DetectionService()
-            service.model = mock_model
-            return service
-    
-    @pytest.fixture
-    def sample_image(self):
-        """Create a temporary sample image for testing"""
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-            # Create a simple test image
-            img = Image.new('RGB', (100, 100), color='red')
-            img.save(tmp_file.name)
-            yield tmp_file.name
-        
-        # Cleanup
-        if os.path.exists(tmp_file.name):
-            os.unlink(tmp_file.name)
-    
-    def test_detection_service_initialization(self):
-        """Test that detection service initializes correctly"""
-        with patch('app.services.detection_service.YOLO') as mock_yolo:
-            mock_model = Mock()
-            mock_yolo.return_value = mock_model
-            
-            service = DetectionService()
-            
-            mock_yolo.assert_called_once_with('yolov8n.pt')
-            assert service.model == mock_model
-    
-    def test_detection_service_initialization_failure(self):
-        """Test that detection service handles initialization failure"""
-        with patch('app.services.detection_service.YOLO', side_effect=Exception("Model load failed")):
-            with pytest.raises(RuntimeError, match="Could not initialize detection model"):
-                DetectionService()
-    
-    @pytest.mark.asyncio
-    async def test_detect_objects_success(self, detection_service, sample_image):
-        """Test successful object detection"""
-        # Mock YOLO results
-        mock_box = Mock()
-        mock_box.cls = [0]  # chair class
-        mock_box.conf = [0.8]  # 80% confidence
-        
-        # Mock tensor-like object for xyxy
-        mock_tensor = Mock()
-        mock_tensor.tolist.return_value = [10.0, 20.0, 50.0, 60.0]
-        mock_box.xyxy = [mock_tensor]  # bounding box
-        
-        mock_boxes = Mock()
-        mock_boxes.__iter__ = Mock(return_value=iter([mock_box]))
-        
-        mock_result = Mock()
-        mock_result.boxes = mock_boxes
-        
-        detection_service.model.return_value = [mock_result]
-        
-        # Test detection
-        results = await detection_service.detect_objects(sample_image)
-        
-        assert len(results) == 1
-        assert results[0].name == 'chair'
-        assert results[0].confidence == 0.8
-        assert results[0].bbox == [10.0, 20.0, 40.0, 40.0]  # [x, y, width, height]
-    
-    @pytest.mark.asyncio
-    async def test_detect_objects_no_detections(self, detection_service, sample_image):
-        """Test detection with no objects found"""
-        mock_result = Mock()
-        mock_result.boxes = None
-        
-        detection_service.model.return_value = [mock_result]
-        
-        results = await detection_service.detect_objects(sample_image)
-        
-        assert len(results) == 0
-    
-    @pytest.mark.asyncio
-    async def test_detect_objects_low_confidence_filtered(self, detection_service, sample_image):
-        """Test that low confidence detections are filtered out"""
-        # Mock YOLO results with low confidence
-        mock_box = Mock()
-        mock_box.cls = [0]  # chair class
-        mock_box.conf = [0.2]  # 20% confidence (below 0.3 threshold)
-        
-        # Mock tensor-like object for xyxy
-        mock_tensor = Mock()
-        mock_tensor.tolist.return_value = [10.0, 20.0, 50.0, 60.0]
-        mock_box.xyxy = [mock_tensor]
-        
-        mock_boxes = Mock()
-        mock_boxes.__iter__ = Mock(return_value=iter([mock_box]))
-        
-        mock_result = Mock()
-        mock_result.boxes = mock_boxes
-        
-        detection_service.model.return_value = [mock_result]
-        
-        results = await detection_service.detect_objects(sample_image)
-        
-        assert len(results) == 0
-    
-    @pytest.mark.asyncio
-    async def test_detect_objects_file_not_found(self, detection_service):
-        """Test detection with non-existent file"""
-        with pytest.raises(RuntimeError, match="Object detection failed"):
-            await detection_service.detect_objects("nonexistent_file.jpg")
-    
-    @pytest.mark.asyncio
-    async def test_detect_objects_processing_error(self, detection_service, sample_image):
-        """Test detection with processing error"""
-        detection_service.model.side_effect = Exception("Processing failed")
-        
-        with pytest.raises(RuntimeError, match="Object detection failed"):
-            await detection_service.detect_objects(sample_image)
-    
-    def test_filter_relevant_objects(self, detection_service):
-        """Test filtering of relevant objects based on requirements"""
-        # Create test detections
-        detections = [
-            DetectedObject("chair", 0.8, [10, 20, 30, 40]),
-            DetectedObject("table", 0.7, [50, 60, 70, 80]),
-            DetectedObject("person", 0.9, [90, 100, 110, 120]),  # Not in requirements
-        ]
-        
-        requirements = ["chair", "sofa"]  # Only chair matches
-        
-        filtered = detection_service.filter_relevant_objects(detections, requirements)
-        
-        assert len(filtered) == 1
-        assert filtered[0].name == "chair"
-    
-    def test_filter_relevant_objects_with_synonyms(self, detection_service):
-        """Test filtering with synonym matching"""
-        detections = [
-            DetectedObject("couch", 0.8, [10, 20, 30, 40]),
-        ]
-        
-        requirements = ["sofa"]  # Should match "couch"
-        
-        filtered = detection_service.filter_relevant_objects(detections, requirements)
-        
-        assert len(filtered) == 1
-        assert filtered[0].name == "couch"
-    
-    def test_objects_match_direct(self, detection_service):
-        """Test direct object name matching"""
-        assert detection_service._objects_match("chair", "chair") == True
-        assert detection_service._objects_match("chair", "table") == False
-    
-    def test_objects_match_synonyms(self, detection_service):
-        """Test synonym matching"""
-        assert detection_service._objects_match("couch", "sofa") == True
-        assert detection_service._objects_match("sofa", "couch") == True
-        assert detection_service._objects_match("tv", "television") == True
-    
-    def test_objects_match_partial(self, detection_service):
-        """Test partial matching"""
-        assert detection_service._objects_match("dining table", "table") == True
-        assert detection_service._objects_match("table", "dining table") == True
-    
-    def test_get_supported_objects(self, detection_service):
-        """Test getting list of supported objects"""
-        supported = detection_service.get_supported_objects()
-        
-        assert isinstance(supported, list)
-        assert len(supported) > 0
-        assert 'chair' in supported
+import pytest
+import os
+import tempfile
+import asyncio
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch, MagicMock
+from PIL import Image
+import numpy as np
+import torch
+from app.services.detection_service import DetectionService, DetectedObject, get_detection_service, letterbox_tensor
+from ultralytics.data.augment import LetterBox
+
+class FakeBoxes:
+    """Minimal stand-in for Ultralytics Boxes backed by tensors"""
+    
+    def __init__(self, cls, conf, xyxy):
+        self.cls = torch.tensor(cls, dtype=torch.float32)
+        self.conf = torch.tensor(conf, dtype=torch.float32)
+        self.xyxy = torch.tensor(xyxy, dtype=torch.float32).reshape(-1, 4)
+        self.data = torch.cat([self.xyxy, self.conf[:, None], self.cls[:, None]], dim=1)
+    
+    def __len__(self):
+        return len(self.cls)
+
+def fake_result(boxes=None, orig_shape=None):
+    """Minimal stand-in for an Ultralytics Results object"""
+    return SimpleNamespace(boxes=boxes, orig_shape=orig_shape)
+
+class TestDetectionService:
+    
+    @pytest.fixture(scope="class")
+    def shared_detection_service(self):
+        """Create one detection service with a mocked model for the whole class"""
+        with patch('app.services.detection_service.YOLO') as mock_yolo:
+            mock_model = Mock()
+            mock_model.names = {0: 'chair', 1: 'table', 2: 'sofa'}
+            mock_yolo.return_value = mock_model
+            
+            service = DetectionService()
+            service.model = mock_model
+        yield service, dict(vars(service))
+        service.shutdown()
+    
+    @pytest.fixture
+    def detection_service(self, shared_detection_service):
+        """The shared detection service, with its state and mocked model reset for this test"""
+        service, initial_state = shared_detection_service
+        vars(service).clear()
+        vars(service).update(initial_state)
+        service.model.reset_mock(return_value=True, side_effect=True)
+        return service
+    
+    @pytest.fixture(scope="session")
+    def sample_image(self, tmp_path_factory):
+        """Create one sample image for the session; tests only read it"""
+        image_path = tmp_path_factory.mktemp("images") / "sample.jpg"
+        Image.new('RGB', (100, 100), color='red').save(image_path)
+        return str(image_path)
+    
+    def test_detection_service_initialization(self):
+        """Test that detection service initializes correctly"""
+        with patch('app.services.detection_service.YOLO') as mock_yolo:
+            mock_model = Mock()
+            mock_yolo.return_value = mock_model
+            
+            service = DetectionService()
+            
+            mock_yolo.assert_called_once_with('yolov8n.pt')
+            assert service.model == mock_model
+    
+    def test_detection_service_initialization_failure(self):
+        """Test that detection service handles initialization failure"""
+        with patch('app.services.detection_service.YOLO', side_effect=Exception("Model load failed")):
+            with pytest.raises(RuntimeError, match="Could not initialize detection model"):
+                DetectionService()
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_success(self, detection_service, sample_image):
+        """Test successful object detection"""
+        # Mock YOLO results
+        mock_result = fake_result(FakeBoxes(cls=[0], conf=[0.8], xyxy=[[10.0, 20.0, 50.0, 60.0]]))  # chair
+        
+        detection_service.model.return_value = [mock_result]
+        
+        # Test detection
+        results = await detection_service.detect_objects(sample_image)
+        
+        assert len(results) == 1
+        assert results[0].name == 'chair'
+        assert results[0].confidence == pytest.approx(0.8)
+        assert results[0].bbox == [10.0, 20.0, 40.0, 40.0]  # [x, y, width, height]
+        assert type(results[0].confidence) is float
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_no_detections(self, detection_service, sample_image):
+        """Test detection with no objects found"""
+        mock_result = fake_result()
+        
+        detection_service.model.return_value = [mock_result]
+        
+        results = await detection_service.detect_objects(sample_image)
+        
+        assert len(results) == 0
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_low_confidence_filtered(self, detection_service, sample_image):
+        """Test that low confidence detections are filtered out"""
+        # Mock YOLO results with low confidence (below the 0.4 threshold)
+        mock_result = fake_result(FakeBoxes(cls=[0], conf=[0.2], xyxy=[[10.0, 20.0, 50.0, 60.0]]))
+        
+        detection_service.model.return_value = [mock_result]
+        
+        results = await detection_service.detect_objects(sample_image)
+        
+        assert len(results) == 0
+    
+    def test_parse_result_filters_and_converts_all_boxes(self, detection_service):
+        """Test vectorized filtering and xyxy to xywh conversion across several boxes"""
+        mock_result = fake_result(FakeBoxes(
+            cls=[0, 1, 2],
+            conf=[0.9, 0.3, 0.5],
+            xyxy=[[0.0, 0.0, 10.0, 20.0], [5.0, 5.0, 6.0, 6.0], [100.0, 50.0, 160.0, 90.0]]
+        ))
+        
+        objects = detection_service._parse_result(mock_result)
+        
+        assert [obj.name for obj in objects] == ['chair', 'sofa']
+        assert [obj.bbox for obj in objects] == [[0.0, 0.0, 10.0, 20.0], [100.0, 50.0, 60.0, 40.0]]
+        
+        mock_result.boxes = FakeBoxes(cls=[], conf=[], xyxy=[])
+        assert detection_service._parse_result(mock_result) == []
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_file_not_found(self, detection_service):
+        """Test detection with non-existent file"""
+        with pytest.raises(RuntimeError, match="Object detection failed"):
+            await detection_service.detect_objects("nonexistent_file.jpg")
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_processing_error(self, detection_service, sample_image):
+        """Test detection with processing error"""
+        detection_service.model.side_effect = Exception("Processing failed")
+        
+        with pytest.raises(RuntimeError, match="Object detection failed"):
+            await detection_service.detect_objects(sample_image)
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_batch(self, detection_service, sample_image):
+        """Test that batched detection splits by batch size and keeps input order"""
+        def make_result(class_id):
+            mock_result = fake_result(FakeBoxes(cls=[class_id], conf=[0.9], xyxy=[[0.0, 0.0, 10.0, 10.0]]))
+            return mock_result
+        
+        detection_service.model.side_effect = lambda source, **kwargs: [make_result(i) for i in range(len(source))]
+        
+        with patch('app.config.settings.batch_size', 2):
+            results = await detection_service.detect_objects_batch([sample_image] * 3)
+        
+        # Three images with a batch size of two take two model calls
+        assert detection_service.model.call_count == 2
+        assert [[obj.name for obj in objs] for objs in results] == [['chair'], ['table'], ['chair']]
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_batch_passes_decoded_images(self, detection_service, sample_image):
+        """Test that batches are decoded up front and passed to the model as arrays"""
+        detection_service.model.side_effect = lambda source, **kwargs: [fake_result() for _ in source]
+        
+        with patch('app.config.settings.batch_size', 2):
+            results = await detection_service.detect_objects_batch([sample_image] * 5)
+        
+        assert results == [[], [], [], [], []]
+        batches = [call.args[0] for call in detection_service.model.call_args_list]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert all(isinstance(image, np.ndarray) and image.shape == (100, 100, 3) for batch in batches for image in batch)
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_batch_preprocessed_tensor(self, detection_service, sample_image):
+        """Test the GPU loader path: letterboxed tensors in, boxes mapped back to the original image"""
+        detection_service._preprocess_in_loader = True
+        
+        def predict(source, **kwargs):
+            mock_result = fake_result(
+                FakeBoxes(cls=[0], conf=[0.9], xyxy=[[0.0, 0.0, 640.0, 640.0]]), orig_shape=(640, 640)
+            )
+            return [mock_result] * len(source)
+        
+        detection_service.model.side_effect = predict
+        
+        results = await detection_service.detect_objects_batch([sample_image] * 2)
+        
+        source = detection_service.model.call_args.args[0]
+        assert isinstance(source, torch.Tensor)
+        assert source.shape == (2, 3, 640, 640)
+        assert 0.0 <= float(source.min()) and float(source.max()) <= 1.0
+        # The 100x100 sample image fills the whole letterboxed frame
+        assert [objs[0].bbox for objs in results] == [[0.0, 0.0, 100.0, 100.0]] * 2
+    
+    def test_letterbox_tensor_matches_ultralytics(self):
+        """Test that tensor letterboxing produces the same frame layout as Ultralytics"""
+        image = np.full((100, 200, 3), 50, dtype=np.uint8)
+        
+        expected = LetterBox(new_shape=(640, 640), auto=False)(image=image).transpose(2, 0, 1)
+        actual = letterbox_tensor(torch.from_numpy(image).permute(2, 0, 1), 640)
+        
+        assert actual.dtype == torch.uint8
+        assert np.array_equal(actual.numpy(), expected)
+    
+    def test_decode_batch_on_device(self, detection_service, sample_image):
+        """Test JPEG decoding into a letterboxed batch (on CPU here)"""
+        batch, original_shapes = detection_service._decode_batch_on_device([sample_image] * 2)
+        
+        assert batch.shape == (2, 3, 640, 640)
+        assert original_shapes == [(100, 100), (100, 100)]
+        # The red sample image decodes as RGB
+        assert batch[0, 0, 320, 320] > 200 and batch[0, 2, 320, 320] < 50
+    
+    def test_gpu_decode_failure_falls_back_to_cpu(self, detection_service, sample_image):
+        """Test that a failed device decode switches to CPU preprocessing for good"""
+        detection_service._gpu_decode = True
+        
+        with patch.object(detection_service, '_decode_batch_on_device', side_effect=RuntimeError("nvjpeg missing")):
+            batch, original_shapes = detection_service._prepare_tensor_batch([sample_image])
+        
+        assert batch.shape == (1, 3, 640, 640)
+        assert original_shapes == [(100, 100)]
+        assert detection_service._gpu_decode is False
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_batch_prunes_classes_in_nms(self, detection_service, sample_image):
+        """Test that requirements become class ids and the confidence threshold is passed to the model"""
+        detection_service.model.return_value = [fake_result()]
+        
+        await detection_service.detect_objects_batch([sample_image], ["Couch", "chair"])
+        
+        kwargs = detection_service.model.call_args.kwargs
+        assert kwargs["classes"] == [0, 2]  # 'sofa' matches 'couch' as a synonym
+        assert kwargs["conf"] == 0.4
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_batch_keeps_all_classes_without_match(self, detection_service, sample_image):
+        """Test that requirements the model cannot detect don't prune every class"""
+        detection_service.model.return_value = [fake_result()]
+        
+        await detection_service.detect_objects_batch([sample_image], ["window"])
+        
+        assert detection_service.model.call_args.kwargs["classes"] is None
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_batch_unreadable_image(self, detection_service):
+        """Test batched detection with a file that is not an image"""
+        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
+            tmp_file.write(b"not an image")
+        
+        try:
+            with pytest.raises(RuntimeError, match="Could not decode image"):
+                await detection_service.detect_objects_batch([tmp_file.name])
+        finally:
+            os.unlink(tmp_file.name)
+        
+        detection_service.model.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_detect_objects_batch_file_not_found(self, detection_service, sample_image):
+        """Test batched detection with a missing file"""
+        with pytest.raises(RuntimeError, match="Object detection failed"):
+            await detection_service.detect_objects_batch([sample_image, "nonexistent_file.jpg"])
+        
+        detection_service.model.assert_not_called()
+    
+    def test_tensorrt_engine_exported_on_gpu(self, tmp_path, monkeypatch):
+        """Test that a TensorRT engine is exported once and loaded on GPU hosts"""
+        monkeypatch.chdir(tmp_path)
+        with patch('app.services.detection_service.YOLO') as mock_yolo, \
+             patch('app.services.detection_service.torch.cuda.is_available', return_value=True), \
+             patch('app.services.detection_service.torch.cuda.Stream'):
+            (tmp_path / "yolov8n.engine").touch()
+            mock_yolo.return_value.export.return_value = "yolov8n.engine"
+            
+            DetectionService()
+        
+        export_kwargs = mock_yolo.return_value.export.call_args.kwargs
+        assert export_kwargs["format"] == "engine"
+        assert export_kwargs["half"] is True
+        assert export_kwargs["int8"] is False  # No calibration data configured
+        assert export_kwargs["imgsz"] == 640
+        # The engine is cached under a name that records how it was built
+        engine_path = Path("trt_cache") / "yolov8n-640-b8-fp16.engine"
+        assert (tmp_path / engine_path).exists()
+        mock_yolo.assert_called_with(str(engine_path), task="detect")
+        
+        # A later start reuses the cached engine instead of exporting again
+        with patch('app.services.detection_service.YOLO') as mock_yolo, \
+             patch('app.services.detection_service.torch.cuda.is_available', return_value=True), \
+             patch('app.services.detection_service.torch.cuda.Stream'):
+            DetectionService()
+        
+        mock_yolo.return_value.export.assert_not_called()
+    
+    def test_tensorrt_failure_falls_back_to_pytorch(self):
+        """Test that a failed engine export keeps the PyTorch model"""
+        with patch('app.services.detection_service.YOLO') as mock_yolo, \
+             patch('app.services.detection_service.torch.cuda.is_available', return_value=True), \
+             patch('app.services.detection_service.torch.cuda.Stream'):
+            pytorch_model = mock_yolo.return_value
+            pytorch_model.export.side_effect = RuntimeError("TensorRT not installed")
+            
+            service = DetectionService()
+        
+        assert service.model is pytorch_model
+    
+    @pytest.mark.asyncio
+    async def test_inference_runs_on_dedicated_thread(self, detection_service, sample_image):
+        """Test that every model call runs on the single inference thread"""
+        thread_names = []
+        
+        def record_thread(source, **kwargs):
+            thread_names.append(threading.current_thread().name)
+            return [fake_result() for _ in source]
+        
+        detection_service.model.side_effect = record_thread
+        
+        await asyncio.gather(*(detection_service.detect_objects(sample_image) for _ in range(4)))
+        
+        assert len(thread_names) == 4
+        assert len(set(thread_names)) == 1
+        assert thread_names[0].startswith("yolo-inference")
+    
+    @pytest.mark.asyncio
+    async def test_inference_runs_in_inference_mode(self, detection_service, sample_image):
+        """Test that the model is called with autograd disabled on the inference thread"""
+        modes = []
+        
+        def record_mode(source, **kwargs):
+            modes.append(torch.is_inference_mode_enabled())
+            return [fake_result() for _ in source]
+        
+        detection_service.model.side_effect = record_mode
+        
+        await detection_service.detect_objects(sample_image)
+        
+        assert modes == [True]
+    
+    def test_warmup_runs_one_dummy_prediction(self, detection_service):
+        """Test that warmup primes the model with a blank image of the input size"""
+        detection_service.warmup()
+        
+        images = detection_service.model.call_args.args[0]
+        assert len(images) == 1
+        assert images[0].shape == (640, 640, 3)
+    
+    def test_warmup_failure_is_not_fatal(self, detection_service):
+        """Test that a failed warmup leaves the service usable"""
+        detection_service.model.side_effect = RuntimeError("CUDA error")
+        
+        detection_service.warmup()
+    
+    def test_cuda_graph_replay_pads_and_masks_short_batch(self, detection_service):
+        """Test that a short batch is zero-padded into the captured graph and padding is dropped"""
+        # Captured for 4 images of 8x8; raw output is (batch, 4 box + 3 class scores, anchors)
+        detection_service._graph_input = torch.ones((4, 3, 8, 8))
+        detection_service._graph_output = torch.zeros((4, 7, 2))
+        detection_service._graph_output[:, :4, 0] = torch.tensor([4.0, 4.0, 2.0, 2.0])
+        detection_service._graph_output[:, 5, 0] = 0.9  # one confident 'table' per image
+        detection_service._graph = Mock()
+        detection_service.model.predictor.args = Mock(
+            conf=0.25, iou=0.7, classes=None, agnostic_nms=False, max_det=300
+        )
+        
+        batch = torch.full((2, 3, 8, 8), 255, dtype=torch.uint8)
+        results = detection_service._call_model(batch)
+        
+        detection_service._graph.replay.assert_called_once()
+        detection_service.model.assert_not_called()
+        assert torch.all(detection_service._graph_input[:2] == 1)
+        assert torch.all(detection_service._graph_input[2:] == 0)
+        assert len(results) == 2
+        
+        objects = detection_service._parse_result(results[0], (8, 8))
+        assert [obj.name for obj in objects] == ['table']
+        assert objects[0].bbox == pytest.approx([3.0, 3.0, 2.0, 2.0])
+    
+    def test_model_called_with_configured_image_size(self, detection_service):
+        """Test that inference uses the configured input size"""
+        with patch('app.config.settings.image_size', 480):
+            detection_service._call_model([np.zeros((100, 100, 3), dtype=np.uint8)])
+        
+        assert detection_service.model.call_args.kwargs["imgsz"] == 480
+    
+    def test_cpu_bfloat16_autocast(self, detection_service):
+        """Test that CPU inference runs under bfloat16 autocast when enabled"""
+        autocast_states = []
+        detection_service.model.side_effect = lambda source, **kwargs: autocast_states.append(
+            torch.is_autocast_cpu_enabled()
+        )
+        
+        detection_service._call_model([])
+        detection_service._cpu_bfloat16 = True
+        detection_service._call_model([])
+        
+        assert autocast_states == [False, True]
+    
+    def test_get_detection_service_is_shared(self):
+        """Test that the model is loaded once and reused"""
+        with patch('app.services.detection_service.YOLO') as mock_yolo, \
+             patch('app.services.detection_service._detection_service', None):
+            first = get_detection_service()
+            second = get_detection_service()
+        
+        assert first is second
+        mock_yolo.assert_called_once()
+    
+    def test_get_detection_service_loads_once_across_threads(self):
+        """Test that concurrent first calls still load a single model"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with patch('app.services.detection_service.YOLO') as mock_yolo, \
+             patch('app.services.detection_service._detection_service', None):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                services = list(pool.map(lambda _: get_detection_service(), range(8)))
+        
+        assert all(service is services[0] for service in services)
+        mock_yolo.assert_called_once()
+    
+    def test_filter_relevant_objects(self, detection_service):
+        """Test filtering of relevant objects based on requirements"""
+        # Create test detections
+        detections = [
+            DetectedObject("chair", 0.8, [10, 20, 30, 40]),
+            DetectedObject("table", 0.7, [50, 60, 70, 80]),
+            DetectedObject("person", 0.9, [90, 100, 110, 120]),  # Not in requirements
+        ]
+        
+        requirements = ["chair", "sofa"]  # Only chair matches
+        
+        filtered = detection_service.filter_relevant_objects(detections, requirements)
+        
+        assert len(filtered) == 1
+        assert filtered[0].name == "chair"
+    
+    def test_filter_relevant_objects_with_synonyms(self, detection_service):
+        """Test filtering with synonym matching"""
+        detections = [
+            DetectedObject("couch", 0.8, [10, 20, 30, 40]),
+        ]
+        
+        requirements = ["sofa"]  # Should match "couch"
+        
+        filtered = detection_service.filter_relevant_objects(detections, requirements)
+        
+        assert len(filtered) == 1
+        assert filtered[0].name == "couch"
+    
+    def test_filter_relevant_objects_matches_each_name_once(self, detection_service):
+        """Test that repeated detections of a class reuse one match result"""
+        detections = [DetectedObject(name, 0.8, [0, 0, 1, 1]) for name in ["couch", "person", "tv"] * 50]
+        
+        with patch.object(detection_service, '_objects_match', wraps=detection_service._objects_match) as mock_match:
+            filtered = detection_service.filter_relevant_objects(detections, ["Sofa", "television"])
+        
+        assert len(filtered) == 100
+        assert {obj.name for obj in filtered} == {"couch", "tv"}
+        assert mock_match.call_count <= 6  # 3 distinct names x 2 requirements
+    
+    def test_filter_relevant_objects_short_circuits(self, detection_service):
+        """Test the empty-requirement and everything-matches fast paths"""
+        detections = [DetectedObject("chair", 0.8, [0, 0, 1, 1]), DetectedObject("couch", 0.7, [0, 0, 1, 1])]
+        
+        with patch.object(detection_service, '_objects_match') as mock_match:
+            assert detection_service.filter_relevant_objects(detections, []) == []
+            assert detection_service.filter_relevant_objects(detections, ["  "]) == []
+        mock_match.assert_not_called()
+        
+        # When every name matches, the input list is returned as is
+        assert detection_service.filter_relevant_objects(detections, ["chair", "sofa"]) is detections
+    
+    @pytest.mark.parametrize("detected, required, expected", [
+        ("chair", "chair", True),
+        ("chair", "table", False),
+        ("couch", "sofa", True),  # Synonyms, both ways
+        ("sofa", "couch", True),
+        ("tv", "television", True),
+        ("dining table", "table", True),  # Partial names, both ways
+        ("table", "dining table", True)
+    ])
+    def test_objects_match(self, detection_service, detected, required, expected):
+        """Test direct, synonym and partial object name matching"""
+        assert detection_service._objects_match(detected, required) is expected
+    
+    def test_get_supported_objects(self, detection_service):
+        """Test getting list of supported objects"""
+        supported = detection_service.get_supported_objects()
+        
+        assert isinstance(supported, list)
+        assert len(supported) > 0
+        assert 'chair' in supported
         assert 'sofa' in supported
\ No newline at end of file
@@ -0,0 +1,78 @@
+import asyncio
+import random
+import time
+import pytest
+from collections import deque
+from unittest.mock import patch
+from app.monitoring.metrics import PerformanceMonitor
+
+def test_application_metrics_empty():
+    """Test metrics before any request is recorded"""
+    monitor = PerformanceMonitor()
+    
+    metrics = monitor.get_application_metrics()
+    
+    assert metrics["total_requests"] == 0
+    assert metrics["avg_response_time"] == 0
+    assert metrics["max_response_time"] == 0
+    assert metrics["min_response_time"] == 0
+    assert metrics["endpoint_metrics"] == {}
+
+def test_window_statistics_match_recent_requests():
+    """Test that running window stats equal a full recomputation over the last requests"""
+    monitor = PerformanceMonitor(window_size=50)
+    recent = deque(maxlen=50)
+    rng = random.Random(42)
+    
+    for _ in range(500):
+        duration = rng.uniform(0.001, 2.0)
+        monitor.record_request("GET", "/api/projects", duration, 200)
+        recent.append(duration)
+        
+        metrics = monitor.get_application_metrics()
+        assert metrics["avg_response_time"] == round(sum(recent) / len(recent), 4)
+        assert metrics["max_response_time"] == round(max(recent), 4)
+        assert metrics["min_response_time"] == round(min(recent), 4)
+    
+    assert monitor.get_application_metrics()["total_requests"] == 500
+
+def test_endpoint_metrics_and_error_counts():
+    """Test per-endpoint aggregation and error counting"""
+    monitor = PerformanceMonitor()
+    
+    monitor.record_request("GET", "/api/projects", 0.2, 200)
+    monitor.record_request("GET", "/api/projects", 0.4, 500)
+    monitor.record_request("POST", "/api/projects", 0.1, 422)
+    
+    metrics = monitor.get_application_metrics()
+    
+    get_metrics = metrics["endpoint_metrics"]["GET /api/projects"]
+    assert get_metrics["requests"] == 2
+    assert round(get_metrics["avg_response_time"], 4) == 0.3
+    assert get_metrics["error_rate"] == 50.0
+    assert get_metrics["total_errors"] == 1
+    assert metrics["error_counts"] == {500: 1, 422: 1}
+
+def test_system_metrics_do_not_block():
+    """Test that reading system metrics does not sleep to measure CPU"""
+    monitor = PerformanceMonitor()
+    
+    start = time.perf_counter()
+    metrics = monitor.get_system_metrics()
+    
+    assert time.perf_counter() - start < 0.5
+    assert "cpu_percent" in metrics
+    assert "memory_percent" in metrics
+
+@pytest.mark.asyncio
+async def test_system_sampler_refreshes_cached_metrics():
+    """Test that the background sampler keeps the cached sample fresh"""
+    monitor = PerformanceMonitor()
+    
+    with patch.object(monitor, "sample_system_metrics", wraps=monitor.sample_system_metrics) as mock_sample:
+        sampler = asyncio.create_task(monitor.run_system_sampler(interval=0.01))
+        await asyncio.sleep(0.1)
+        sampler.cancel()
+    
+    assert mock_sample.call_count >= 2
+    assert monitor.get_system_metrics()["cpu_percent"] >= 0
\ No newline at end of file
@@ -1,213 +1,162 @@
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.database.connection import Base, get_db
-from app.models.project import Project, Requirement
-from main import app
-import tempfile
-import os
-import json
-
-@pytest.fixture
-def test_db():
-    """Create a temporary test database"""
-    # Create temporary database file
-    db_fd, db_path = tempfile.mkstemp()
-    database_url = f"sqlite:///{db_path}"
-    
-    # Create test engine and session
-    engine = create_engine(database_url, connect_args={"check_same_thread": False})
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Create tables
-    Base.metadata.create_all(bind=engine)
-    
-    def override_get_db():
-        try:
-            db = TestingSessionLocal()
-            yield db
-        finally:
-            db.close()
-    
-    app.dependency_overrides[get_db] = override_get_db
-    
-    yield TestingSessionLocal()
-    
-    # Cleanup
-    app.dependency_overrides.clear()
-    engine.dispose()
-    os.close(db_fd)
-    try:
-        os.unlink(db_path)
-    except PermissionError:
-        pass
-
-@pytest.fixture
-def client():
-    """Create test client"""
-    return TestClient(app)
-
-def test_create_project_success(client, test_db):
-    """Test successful project creation"""
-    project_data = {
-        "name": "Test Project",
-        "requirements": ["chair", "table", "lamp"]
-    }
-    
-    response = client.post("/api/projects/", json=project_data)
-    
-    assert response.status_code == 201
-    data = response.json()
-    assert data["name"] == "Test Project"
-    assert len(data["requirements"]) == 3
-    assert "chair" in data["requirements"]
-    assert "id" in data
-    assert "created_at" in data
-
-def test_create_project_invalid_empty_name(client, test_db):
-    """Test project creation with empty name"""
-    project_data = {
-        "name": "",
-        "requirements": ["chair"]
-    }
-    
-    response = client.post("/api/projects/", json=project_data)
-    assert response.status_code == 422  # Validation error
-
-def test_create_project_invalid_empty_requirements(client, test_db):
-    """Test project creation with empty requirements"""
-    project_data = {
-        "name": "Test Project",
-        "requirements": []
-    }
-    
-    response = client.post("/api/projects/", json=project_data)
-    assert response.status_code == 422  # Validation error
-
-def test_create_project_invalid_long_name(client, test_db):
-    """Test project creation with name too long"""
-    project_data = {
-        "name": "x" * 256,  # Too long
-        "requirements": ["chair"]
-    }
-    
-    response = client.post("/api/projects/", json=project_data)
-    assert response.status_code == 422  # Validation error
-
-def test_get_project_success(client, test_db):
-    """Test successful project retrieval"""
-    # First create a project
-    project_data = {
-        "name": "Test Project",
-        "requirements": ["chair", "table"]
-    }
-    
-    create_response = client.post("/api/projects/", json=project_data)
-    assert create_response.status_code == 201
-    project_id = create_response.json()["id"]
-    
-    # Then retrieve it
-    response = client.get(f"/api/projects/{project_id}")
-    
-    assert response.status_code == 200
-    data = response.json()
-    assert data["id"] == project_id
-    assert data["name"] == "Test Project"
-    assert len(data["requirements"]) == 2
-    assert "chair" in data["requirements"]
-    assert "table" in data["requirements"]
-
-def test_get_project_not_found(client, test_db):
-    """Test retrieving non-existent project"""
-    response = client.get("/api/projects/non-existent-id")
-    
-    assert response.status_code == 404
-    data = response.json()
-    assert "not found" in data["detail"].lower()
-
-def test_get_all_projects_empty(client, test_db):
-    """Test retrieving all projects when none exist"""
-    response = client.get("/api/projects/")
-    
-    assert response.status_code == 200
-    data = response.json()
-    assert isinstance(data, list)
-    assert len(data) == 0
-
-def test_get_all_projects_with_data(client, test_db):
-    """Test retrieving all projects with existing data"""
-    # Create multiple projects
-    projects_data = [
-        {"name": "Project 1", "requirements": ["chair", "table"]},
-        {"name": "Project 2", "requirements": ["lamp", "sofa"]},
-        {"name": "Project 3", "requirements": ["window", "door"]}
-    ]
-    
-    created_ids = []
-    for project_data in projects_data:
-        response = client.post("/api/projects/", json=project_data)
-        assert response.status_code == 201
-        created_ids.append(response.json()["id"])
-    
-    # Retrieve all projects
-    response = client.get("/api/projects/")
-    
-    assert response.status_code == 200
-    data = response.json()
-    assert isinstance(data, list)
-    assert len(data) == 3
-    
-    # Check that all created projects are returned
-    returned_ids = [project["id"] for project in data]
-    for created_id in created_ids:
-        assert created_id in returned_ids
-    
-    # Check project names
-    returned_names = [project["name"] for project in data]
-    assert "Project 1" in returned_names
-    assert "Project 2" in returned_names
-    assert "Project 3" in returned_names
-
-def test_project_requirements_normalization(client, test_db):
-    """Test that requirements are normalized (lowercase, trimmed)"""
-    project_data = {
-        "name": "Test Project",
-        "requirements": ["  CHAIR  ", "Table", "  lamp"]
-    }
-    
-    response = client.post("/api/projects/", json=project_data)
-    
-    assert response.status_code == 201
-    data = response.json()
-    requirements = data["requirements"]
-    
-    # Requirements should be normalized to lowercase and trimmed
-    assert "chair" in requirements
-    assert "table" in requirements
-    assert "lamp" in requirements
-    
-    # Original formats should not be present
-    assert "  CHAIR  " not in requirements
-    assert "Table" not in requirements
-
-def test_api_content_type_validation(client, test_db):
-    """Test API validates content type"""
-    # Send invalid content type
-    response = client.post(
-        "/api/projects/",
-        data="invalid data",
-        headers={"Content-Type": "text/plain"}
-    )
-    
-    assert response.status_code == 422
-
-def test_api_missing_fields(client, test_db):
-    """Test API validates required fields"""
-    # Missing name
-    response = client.post("/api/projects/", json={"requirements": ["chair"]})
-    assert response.status_code == 422
-    
-    # Missing requirements
-    response = client.post("/api/projects/", json={"name": "Test"})
-    assert response.status_code == 422
\ No newline at end of file
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+from app.database.connection import get_db
+from app.models.project import Project, Requirement
+from main import app
+import json
+
+# Session factory of the running test; the get_db override reads it per request
+_session_factory_holder = {"factory": None}
+
+async def override_get_db():
+    session_factory = _session_factory_holder["factory"]
+    if session_factory is None:
+        # The override outlives this module; other modules get the real database
+        async for db in get_db():
+            yield db
+        return
+    async with session_factory() as db:
+        yield db
+
+@pytest.fixture(scope="session")
+def client():
+    """Create one test client, served from the test database, for the whole session"""
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+@pytest.fixture
+def test_db(client, session_factory):
+    """Point the client at the shared test database, rolled back after each test"""
+    _session_factory_holder["factory"] = session_factory
+    yield
+    _session_factory_holder["factory"] = None
+
+@pytest_asyncio.fixture
+async def seeded_projects(test_db, session_factory):
+    """Insert three projects with two requirements each straight through a session"""
+    projects = [
+        Project(name=name, requirements=[Requirement(object_name=object_name) for object_name in requirements])
+        for name, requirements in (
+            ("Project 1", ["chair", "table"]),
+            ("Project 2", ["lamp", "sofa"]),
+            ("Project 3", ["window", "door"])
+        )
+    ]
+    async with session_factory() as db:
+        db.add_all(projects)
+        await db.commit()
+    return projects
+
+def test_create_project_success(client, test_db):
+    """Test successful project creation"""
+    project_data = {
+        "name": "Test Project",
+        "requirements": ["chair", "table", "lamp"]
+    }
+    
+    response = client.post("/api/projects/", json=project_data)
+    
+    assert response.status_code == 201
+    data = response.json()
+    assert data["name"] == "Test Project"
+    assert len(data["requirements"]) == 3
+    assert "chair" in data["requirements"]
+    assert "id" in data
+    assert "created_at" in data
+
+@pytest.mark.parametrize("payload", [
+    {"name": "", "requirements": ["chair"]},
+    {"name": "Test Project", "requirements": []},
+    {"name": "x" * 256, "requirements": ["chair"]},  # Too long
+    {"requirements": ["chair"]},
+    {"name": "Test"},
+    "invalid data"  # Sent as text/plain
+], ids=["empty_name", "empty_requirements", "long_name", "missing_name", "missing_requirements", "text_body"])
+def test_create_project_validation_error(client, test_db, payload):
+    """Test that invalid project payloads are rejected"""
+    if isinstance(payload, str):
+        response = client.post("/api/projects/", content=payload, headers={"Content-Type": "text/plain"})
+    else:
+        response = client.post("/api/projects/", json=payload)
+    
+    assert response.status_code == 422  # Validation error
+
+def test_get_project_success(client, seeded_projects):
+    """Test successful project retrieval"""
+    project = seeded_projects[0]
+    
+    response = client.get(f"/api/projects/{project.id}")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == project.id
+    assert data["name"] == "Project 1"
+    assert len(data["requirements"]) == 2
+    assert "chair" in data["requirements"]
+    assert "table" in data["requirements"]
+
+def test_get_project_not_found(client, test_db):
+    """Test retrieving non-existent project"""
+    response = client.get("/api/projects/non-existent-id")
+    
+    assert response.status_code == 404
+    data = response.json()
+    assert "not found" in data["detail"].lower()
+
+def test_error_response_request_id_matches_header(client, test_db):
+    """Test that error responses carry the same request id as the response header"""
+    response = client.get("/api/projects/non-existent-id")
+    
+    assert response.status_code == 404
+    request_id = response.headers["X-Request-ID"]
+    assert len(request_id) == 32
+    assert response.json()["request_id"] == request_id
+    
+    # Every request gets its own id
+    assert client.get("/api/projects/non-existent-id").headers["X-Request-ID"] != request_id
+
+def test_get_all_projects_empty(client, test_db):
+    """Test retrieving all projects when none exist"""
+    response = client.get("/api/projects/")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data, list)
+    assert len(data) == 0
+
+def test_get_all_projects_with_data(client, seeded_projects):
+    """Test retrieving all projects with existing data"""
+    response = client.get("/api/projects/")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data, list)
+    assert len(data) == 3
+    
+    # Check that all seeded projects are returned
+    assert {project["id"] for project in data} == {project.id for project in seeded_projects}
+    assert {project["name"] for project in data} == {"Project 1", "Project 2", "Project 3"}
+
+def test_project_requirements_normalization(client, test_db):
+    """Test that requirements are normalized (lowercase, trimmed)"""
+    project_data = {
+        "name": "Test Project",
+        "requirements": ["  CHAIR  ", "Table", "  lamp"]
+    }
+    
+    response = client.post("/api/projects/", json=project_data)
+    
+    assert response.status_code == 201
+    data = response.json()
+    requirements = data["requirements"]
+    
+    # Requirements should be normalized to lowercase and trimmed
+    assert "chair" in requirements
+    assert "table" in requirements
+    assert "lamp" in requirements
+    
+    # Original formats should not be present
+    assert "  CHAIR  " not in requirements
+    assert "Table" not in requirements
\ No newline at end of file
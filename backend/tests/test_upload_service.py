@@ -1,247 +1,434 @@
-import pytest
-import tempfile
-import os
-from unittest.mock import Mock, patch, AsyncMock
-from fastapi import UploadFile, HTTPException
-from sqlalchemy.orm import Session
-from PIL import Image
-import io
-from app.services.upload_service import UploadService
-from app.services.detection_service import DetectedObject
-from app.models.project import Project, Requirement, Detection
-
-class TestUploadService:
-    
-    @pytest.fixture
-    def mock_db(self):
-        """Create a mock database session"""
-        return Mock(spec=Session)
-    
-    @pytest.fixture
-    def mock_project(self):
-        """Create a mock project with requirements"""
-        project = Mock(spec=Project)
-        project.id = "test-project-id"
-        project.name = "Test Project"
-        
-        # Mock requirements
-        req1 = Mock(spec=Requirement)
-        req1.object_name = "chair"
-        req2 = Mock(spec=Requirement)
-        req2.object_name = "table"
-        
-        project.requirements = [req1, req2]
-        return project
-    
-    @pytest.fixture
-    def upload_service(self, mock_db):
-        """Create upload service with mocked dependencies"""
-        with patch('app.services.upload_service.DetectionService') as mock_detection_service:
-            service = UploadService(mock_db)
-            service.detection_service = mock_detection_service.return_value
-            return service
-    
-    @pytest.fixture
-    def sample_upload_file(self):
-        """Create a sample upload file for testing"""
-        # Create a simple test image
-        img = Image.new('RGB', (100, 100), color='red')
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
-        img_bytes.seek(0)
-        
-        upload_file = UploadFile(
-            filename="test_image.jpg",
-            file=img_bytes
-        )
-        return upload_file
-    
-    @pytest.mark.asyncio
-    async def test_process_uploads_success(self, upload_service, mock_db, mock_project, sample_upload_file):
-        """Test successful upload processing"""
-        # Setup mocks
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_project
-        
-        # Mock detection results
-        detected_objects = [
-            DetectedObject("chair", 0.8, [10, 20, 30, 40]),
-            DetectedObject("table", 0.7, [50, 60, 70, 80])
-        ]
-        upload_service.detection_service.detect_objects = AsyncMock(return_value=detected_objects)
-        upload_service.detection_service.filter_relevant_objects.return_value = detected_objects
-        
-        # Mock file saving
-        with patch.object(upload_service, '_save_file') as mock_save_file:
-            mock_save_file.return_value = "/fake/path/test_image.jpg"
-            
-            with patch.object(upload_service, '_store_detections') as mock_store:
-                mock_store.return_value = None
-                
-                # Test upload processing
-                result = await upload_service.process_uploads("test-project-id", [sample_upload_file])
-                
-                assert result.project_id == "test-project-id"
-                assert len(result.uploaded_files) == 1
-                assert len(result.detection_results) == 1
-                assert result.total_objects_detected == 2
-                assert result.processing_summary["total_files_uploaded"] == 1
-    
-    @pytest.mark.asyncio
-    async def test_process_uploads_project_not_found(self, upload_service, mock_db, sample_upload_file):
-        """Test upload processing with non-existent project"""
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        with pytest.raises(HTTPException) as exc_info:
-            await upload_service.process_uploads("nonexistent-project", [sample_upload_file])
-        
-        assert exc_info.value.status_code == 404
-        assert "not found" in str(exc_info.value.detail)
-    
-    @pytest.mark.asyncio
-    async def test_validate_files_success(self, upload_service, sample_upload_file):
-        """Test successful file validation"""
-        validated = await upload_service._validate_files([sample_upload_file])
-        
-        assert len(validated) == 1
-        assert validated[0] == sample_upload_file
-    
-    @pytest.mark.asyncio
-    async def test_validate_files_no_files(self, upload_service):
-        """Test validation with no files"""
-        with pytest.raises(HTTPException) as exc_info:
-            await upload_service._validate_files([])
-        
-        assert exc_info.value.status_code == 400
-        assert "No files provided" in str(exc_info.value.detail)
-    
-    @pytest.mark.asyncio
-    async def test_validate_files_too_many(self, upload_service, sample_upload_file):
-        """Test validation with too many files"""
-        files = [sample_upload_file] * 15  # More than the limit of 10
-        
-        with pytest.raises(HTTPException) as exc_info:
-            await upload_service._validate_files(files)
-        
-        assert exc_info.value.status_code == 400
-        assert "Too many files" in str(exc_info.value.detail)
-    
-    @pytest.mark.asyncio
-    async def test_validate_files_unsupported_format(self, upload_service):
-        """Test validation with unsupported file format"""
-        # Create a text file instead of image
-        text_content = io.BytesIO(b"This is not an image")
-        upload_file = UploadFile(
-            filename="test.txt",
-            file=text_content
-        )
-        
-        with pytest.raises(HTTPException) as exc_info:
-            await upload_service._validate_files([upload_file])
-        
-        assert exc_info.value.status_code == 400
-        assert "unsupported format" in str(exc_info.value.detail)
-    
-    @pytest.mark.asyncio
-    async def test_validate_files_too_large(self, upload_service):
-        """Test validation with file too large"""
-        # Create a large file (mock the size check)
-        large_file = Mock(spec=UploadFile)
-        large_file.filename = "large_image.jpg"
-        large_file.file = Mock()
-        large_file.file.tell.return_value = 15 * 1024 * 1024  # 15MB (over 10MB limit)
-        large_file.file.seek = Mock()
-        
-        with pytest.raises(HTTPException) as exc_info:
-            await upload_service._validate_files([large_file])
-        
-        assert exc_info.value.status_code == 400
-        assert "too large" in str(exc_info.value.detail)
-    
-    @pytest.mark.asyncio
-    async def test_validate_files_empty_file(self, upload_service):
-        """Test validation with empty file"""
-        empty_file = Mock(spec=UploadFile)
-        empty_file.filename = "empty.jpg"
-        empty_file.file = Mock()
-        empty_file.file.tell.return_value = 0  # Empty file
-        empty_file.file.seek = Mock()
-        
-        with pytest.raises(HTTPException) as exc_info:
-            await upload_service._validate_files([empty_file])
-        
-        assert exc_info.value.status_code == 400
-        assert "empty" in str(exc_info.value.detail)
-    
-    @pytest.mark.asyncio
-    async def test_save_file_success(self, upload_service, sample_upload_file):
-        """Test successful file saving"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            upload_path = upload_service.upload_base_path / "test" / "images" / "original"
-            upload_path.mkdir(parents=True, exist_ok=True)
-            
-            # Reset file position
-            sample_upload_file.file.seek(0)
-            
-            file_path = await upload_service._save_file(sample_upload_file, upload_path)
-            
-            assert file_path.exists()
-            assert file_path.suffix == '.jpg'
-            assert file_path.parent == upload_path
-    
-    @pytest.mark.asyncio
-    async def test_store_detections_success(self, upload_service, mock_db):
-        """Test successful detection storage"""
-        detected_objects = [
-            DetectedObject("chair", 0.8, [10, 20, 30, 40]),
-            DetectedObject("table", 0.7, [50, 60, 70, 80])
-        ]
-        
-        await upload_service._store_detections("test-project", "/path/to/image.jpg", detected_objects)
-        
-        # Verify that detections were added to database
-        assert mock_db.add.call_count == 2
-        mock_db.commit.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_store_detections_database_error(self, upload_service, mock_db):
-        """Test detection storage with database error"""
-        mock_db.commit.side_effect = Exception("Database error")
-        
-        detected_objects = [DetectedObject("chair", 0.8, [10, 20, 30, 40])]
-        
-        with pytest.raises(RuntimeError, match="Failed to store detection results"):
-            await upload_service._store_detections("test-project", "/path/to/image.jpg", detected_objects)
-        
-        mock_db.rollback.assert_called_once()
-    
-    def test_get_project_images_success(self, upload_service):
-        """Test getting project images"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create mock project directory with images
-            project_path = upload_service.upload_base_path / "test-project" / "images" / "original"
-            project_path.mkdir(parents=True, exist_ok=True)
-            
-            # Create test image files
-            (project_path / "image1.jpg").touch()
-            (project_path / "image2.png").touch()
-            (project_path / "not_image.txt").touch()  # Should be ignored
-            
-            images = upload_service.get_project_images("test-project")
-            
-            assert len(images) == 2
-            assert any("image1.jpg" in img for img in images)
-            assert any("image2.png" in img for img in images)
-            assert not any("not_image.txt" in img for img in images)
-    
-    def test_get_project_images_no_directory(self, upload_service):
-        """Test getting project images when directory doesn't exist"""
-        images = upload_service.get_project_images("nonexistent-project")
-        
-        assert images == []
-    
-    def test_get_project_images_error_handling(self, upload_service):
-        """Test error handling in get_project_images"""
-        with patch('pathlib.Path.iterdir', side_effect=Exception("Access denied")):
-            images = upload_service.get_project_images("test-project")
-            
+import pytest
+import asyncio
+import tempfile
+import os
+from unittest.mock import Mock, patch, AsyncMock
+from fastapi import UploadFile, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+import io
+import hashlib
+from app.services.upload_service import UploadService
+from app.services.detection_service import DetectedObject
+from app.models.project import Project, Requirement, Detection
+from tests._fixtures import MINIMAL_JPEG
+
+class TestUploadService:
+    
+    @pytest.fixture
+    def mock_db(self):
+        """Create a mock database session"""
+        return Mock(spec=AsyncSession)
+    
+    @pytest.fixture
+    def requirement_rows(self):
+        """Requirement name rows of a project, as returned by the joined query"""
+        return [("chair",), ("table",)]
+    
+    @pytest.fixture
+    def upload_service(self, mock_db):
+        """Create upload service with mocked dependencies"""
+        with patch('app.services.upload_service.get_detection_service') as mock_get_detection_service:
+            service = UploadService(mock_db)
+            service.detection_service = mock_get_detection_service.return_value
+            return service
+    
+    @pytest.fixture
+    def sample_upload_file(self):
+        """Create a sample upload file for testing"""
+        upload_file = UploadFile(
+            filename="test_image.jpg",
+            file=io.BytesIO(MINIMAL_JPEG)
+        )
+        return upload_file
+    
+    @pytest.mark.asyncio
+    async def test_process_uploads_success(self, upload_service, mock_db, requirement_rows, sample_upload_file):
+        """Test successful upload processing"""
+        # Setup mocks
+        mock_db.execute.return_value = Mock(**{"all.return_value": requirement_rows})
+        
+        # Mock detection results
+        detected_objects = [
+            DetectedObject("chair", 0.8, [10, 20, 30, 40]),
+            DetectedObject("table", 0.7, [50, 60, 70, 80])
+        ]
+        upload_service.detection_service.detect_objects_batch = AsyncMock(return_value=[detected_objects])
+        upload_service.detection_service.filter_relevant_objects.return_value = detected_objects
+        
+        # Mock file saving
+        with patch.object(upload_service, '_save_file') as mock_save_file:
+            mock_save_file.return_value = ("/fake/path/test_image.jpg", "digest-a")
+            
+            with patch.object(upload_service, '_store_detections') as mock_store:
+                mock_store.return_value = None
+                
+                # Test upload processing
+                result = await upload_service.process_uploads("test-project-id", [sample_upload_file])
+                
+                assert result.project_id == "test-project-id"
+                assert len(result.uploaded_files) == 1
+                assert len(result.detection_results) == 1
+                assert result.total_objects_detected == 2
+                assert result.processing_summary["total_files_uploaded"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_process_uploads_batches_detection(self, upload_service, mock_db, requirement_rows, sample_upload_file):
+        """Test that all saved images go to the model in one batched call"""
+        mock_db.execute.return_value = Mock(**{"all.return_value": requirement_rows})
+        
+        upload_service.detection_service.detect_objects_batch = AsyncMock(return_value=[
+            [DetectedObject("chair", 0.8, [10, 20, 30, 40])],
+            [DetectedObject("table", 0.7, [50, 60, 70, 80])]
+        ])
+        upload_service.detection_service.filter_relevant_objects.side_effect = lambda objs, reqs: objs
+        
+        with patch.object(upload_service, '_save_file', side_effect=[("/fake/a.jpg", "digest-a"), ("/fake/b.jpg", "digest-b")]), \
+             patch.object(upload_service, '_store_detections'):
+            result = await upload_service.process_uploads("test-project-id", [sample_upload_file, sample_upload_file])
+        
+        upload_service.detection_service.detect_objects_batch.assert_awaited_once_with(["/fake/a.jpg", "/fake/b.jpg"], ["chair", "table"])
+        assert result.uploaded_files == ["/fake/a.jpg", "/fake/b.jpg"]
+        assert [r.detected_objects[0].name for r in result.detection_results] == ["chair", "table"]
+    
+    @pytest.mark.asyncio
+    async def test_process_uploads_continues_after_detection_failure(self, upload_service, mock_db, requirement_rows, sample_upload_file):
+        """Test that one failing file does not stop the others"""
+        mock_db.execute.return_value = Mock(**{"all.return_value": requirement_rows})
+        
+        # The batch fails, so images are retried one by one
+        upload_service.detection_service.detect_objects_batch = AsyncMock(side_effect=RuntimeError("Object detection failed"))
+        upload_service.detection_service.detect_objects = AsyncMock(side_effect=[
+            RuntimeError("Object detection failed"),
+            [DetectedObject("table", 0.7, [50, 60, 70, 80])]
+        ])
+        upload_service.detection_service.filter_relevant_objects.side_effect = lambda objs, reqs: objs
+        
+        with patch.object(upload_service, '_save_file', side_effect=[("/fake/a.jpg", "digest-a"), ("/fake/b.jpg", "digest-b")]), \
+             patch.object(upload_service, '_store_detections') as mock_store:
+            result = await upload_service.process_uploads("test-project-id", [sample_upload_file, sample_upload_file])
+        
+        # Both files were saved, only the second produced detections
+        assert result.uploaded_files == ["/fake/a.jpg", "/fake/b.jpg"]
+        assert [r.image_path for r in result.detection_results] == ["/fake/b.jpg"]
+        assert result.total_objects_detected == 1
+        mock_store.assert_called_once()
+        assert list(mock_store.call_args.args[1]) == ["/fake/b.jpg"]
+    
+    @pytest.mark.asyncio
+    async def test_process_uploads_detects_duplicate_content_once(self, upload_service, mock_db, requirement_rows, sample_upload_file):
+        """Test that files with identical content share one detection run"""
+        mock_db.execute.return_value = Mock(**{"all.return_value": requirement_rows})
+        
+        detected_objects = [DetectedObject("chair", 0.8, [10, 20, 30, 40])]
+        upload_service.detection_service.detect_objects_batch = AsyncMock(return_value=[detected_objects])
+        upload_service.detection_service.filter_relevant_objects.side_effect = lambda objs, reqs: objs
+        
+        with patch.object(upload_service, '_save_file', side_effect=[("/fake/a.jpg", "same"), ("/fake/b.jpg", "same")]), \
+             patch.object(upload_service, '_store_detections') as mock_store:
+            result = await upload_service.process_uploads("test-project-id", [sample_upload_file, sample_upload_file])
+        
+        upload_service.detection_service.detect_objects_batch.assert_awaited_once_with(["/fake/a.jpg"], ["chair", "table"])
+        assert [r.image_path for r in result.detection_results] == ["/fake/a.jpg", "/fake/b.jpg"]
+        assert result.total_objects_detected == 2
+        assert list(mock_store.call_args.args[1]) == ["/fake/a.jpg", "/fake/b.jpg"]
+    
+    @pytest.mark.asyncio
+    async def test_detect_saved_drops_processed_images_from_cache(self, upload_service):
+        """Test that images are advised out of the page cache once detection has read them"""
+        upload_service.detection_service.detect_objects_batch = AsyncMock(side_effect=lambda paths, reqs: [[] for _ in paths])
+        saved_queue = asyncio.Queue()
+        for item in [("/fake/a.jpg", "same"), ("/fake/b.jpg", "same"), None]:
+            saved_queue.put_nowait(item)
+        
+        with patch.object(upload_service, '_advise_cache') as mock_advise:
+            await upload_service._detect_saved(saved_queue, ["chair"])
+        
+        advised = [path for call in mock_advise.call_args_list if call.args[1] == "DONTNEED" for path in call.args[0]]
+        assert advised == ["/fake/a.jpg", "/fake/b.jpg"]
+    
+    @pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise is Linux-only")
+    def test_advise_cache_ignores_missing_files(self, upload_service, tmp_path):
+        """Test that cache hints are passed for existing files and skipped for missing ones"""
+        image = tmp_path / "a.jpg"
+        image.write_bytes(b"data")
+        
+        with patch('app.services.upload_service.os.posix_fadvise') as mock_fadvise:
+            upload_service._advise_cache([image, tmp_path / "missing.jpg"], "WILLNEED")
+        
+        mock_fadvise.assert_called_once()
+        assert mock_fadvise.call_args.args[3] == os.POSIX_FADV_WILLNEED
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("max_wait, expected_batches", [
+        (1.0, [["/fake/a.jpg", "/fake/b.jpg"]]),
+        (0.0, [["/fake/a.jpg"], ["/fake/b.jpg"]])
+    ])
+    async def test_detect_saved_waits_briefly_to_fill_batches(self, upload_service, max_wait, expected_batches):
+        """Test that slow saves are batched together within the wait window, and not beyond it"""
+        upload_service.detection_service.detect_objects_batch = AsyncMock(side_effect=lambda paths, reqs: [[] for _ in paths])
+        saved_queue = asyncio.Queue()
+        
+        async def save_slowly():
+            await saved_queue.put(("/fake/a.jpg", "digest-a"))
+            await asyncio.sleep(0.02)
+            await saved_queue.put(("/fake/b.jpg", "digest-b"))
+            await saved_queue.put(None)
+        
+        with patch('app.config.settings.batch_max_wait', max_wait):
+            _, detections = await asyncio.gather(save_slowly(), upload_service._detect_saved(saved_queue, ["chair"]))
+        
+        batches = [call.args[0] for call in upload_service.detection_service.detect_objects_batch.await_args_list]
+        assert batches == expected_batches
+        assert list(detections) == ["/fake/a.jpg", "/fake/b.jpg"]
+    
+    @pytest.mark.asyncio
+    async def test_process_uploads_project_not_found(self, upload_service, mock_db, sample_upload_file):
+        """Test upload processing with non-existent project"""
+        mock_db.execute.return_value = Mock(**{"all.return_value": []})
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await upload_service.process_uploads("nonexistent-project", [sample_upload_file])
+        
+        assert exc_info.value.status_code == 404
+        assert "not found" in str(exc_info.value.detail)
+    
+    def test_validate_files_success(self, upload_service, sample_upload_file):
+        """Test successful file validation"""
+        validated = upload_service._validate_files([sample_upload_file])
+        
+        assert len(validated) == 1
+        assert validated[0] == sample_upload_file
+    
+    def test_validate_files_no_files(self, upload_service):
+        """Test validation with no files"""
+        with pytest.raises(HTTPException) as exc_info:
+            upload_service._validate_files([])
+        
+        assert exc_info.value.status_code == 400
+        assert "No files provided" in str(exc_info.value.detail)
+    
+    def test_validate_files_too_many(self, upload_service, sample_upload_file):
+        """Test validation with too many files"""
+        files = [sample_upload_file] * 15  # More than the limit of 10
+        
+        with pytest.raises(HTTPException) as exc_info:
+            upload_service._validate_files(files)
+        
+        assert exc_info.value.status_code == 400
+        assert "Too many files" in str(exc_info.value.detail)
+    
+    def test_validate_files_unsupported_format(self, upload_service):
+        """Test validation with unsupported file format"""
+        # Create a text file instead of image
+        text_content = io.BytesIO(b"This is not an image")
+        upload_file = UploadFile(
+            filename="test.txt",
+            file=text_content
+        )
+        
+        with pytest.raises(HTTPException) as exc_info:
+            upload_service._validate_files([upload_file])
+        
+        assert exc_info.value.status_code == 400
+        assert "unsupported format" in str(exc_info.value.detail)
+        # Listed in a stable order, not the set's hash order
+        assert exc_info.value.detail.endswith("Allowed: .bmp, .jpeg, .jpg, .png, .tiff")
+    
+    def test_validate_files_too_large(self, upload_service):
+        """Test validation with file too large"""
+        # Create a large file (mock the size check)
+        large_file = Mock(spec=UploadFile)
+        large_file.filename = "large_image.jpg"
+        large_file.size = None  # Not parsed from a request, so the size is measured
+        large_file.file = Mock()
+        large_file.file.tell.return_value = 15 * 1024 * 1024  # 15MB (over 10MB limit)
+        large_file.file.seek = Mock()
+        
+        with pytest.raises(HTTPException) as exc_info:
+            upload_service._validate_files([large_file])
+        
+        assert exc_info.value.status_code == 400
+        assert "too large" in str(exc_info.value.detail)
+    
+    def test_validate_files_uses_parsed_size(self, upload_service):
+        """Test that the size counted by the multipart parser is used without seeking"""
+        parsed_file = Mock(spec=UploadFile)
+        parsed_file.filename = "large_image.jpg"
+        parsed_file.size = 15 * 1024 * 1024
+        parsed_file.file = Mock()
+        
+        with pytest.raises(HTTPException) as exc_info:
+            upload_service._validate_files([parsed_file])
+        
+        assert "too large" in str(exc_info.value.detail)
+        parsed_file.file.seek.assert_not_called()
+    
+    def test_validate_files_empty_file(self, upload_service):
+        """Test validation with empty file"""
+        empty_file = Mock(spec=UploadFile)
+        empty_file.filename = "empty.jpg"
+        empty_file.size = None
+        empty_file.file = Mock()
+        empty_file.file.tell.return_value = 0  # Empty file
+        empty_file.file.seek = Mock()
+        
+        with pytest.raises(HTTPException) as exc_info:
+            upload_service._validate_files([empty_file])
+        
+        assert exc_info.value.status_code == 400
+        assert "empty" in str(exc_info.value.detail)
+    
+    @pytest.mark.asyncio
+    async def test_save_file_success(self, upload_service, sample_upload_file):
+        """Test successful file saving"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            upload_path = upload_service.upload_base_path / "test" / "images" / "original"
+            upload_path.mkdir(parents=True, exist_ok=True)
+            
+            # Reset file position
+            sample_upload_file.file.seek(0)
+            
+            file_path, digest = await upload_service._save_file(sample_upload_file, upload_path)
+            
+            assert digest == hashlib.sha256(sample_upload_file.file.getvalue()).hexdigest()
+            assert file_path.exists()
+            assert file_path.suffix == '.jpg'
+            assert len(file_path.stem) == 32  # 128 random bits as hex
+            assert file_path.parent == upload_path
+    
+    @pytest.mark.asyncio
+    async def test_save_file_streams_in_chunks(self, upload_service, sample_upload_file):
+        """Test that files larger than the copy buffer are written intact"""
+        upload_path = upload_service.upload_base_path / "test" / "images" / "original"
+        upload_path.mkdir(parents=True, exist_ok=True)
+        upload_service.chunk_size = 256
+        
+        expected = sample_upload_file.file.getvalue()
+        assert len(expected) > upload_service.chunk_size
+        
+        file_path, _ = await upload_service._save_file(sample_upload_file, upload_path)
+        
+        try:
+            assert file_path.read_bytes() == expected
+        finally:
+            file_path.unlink()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not hasattr(os, "copy_file_range"), reason="copy_file_range is Linux-only")
+    async def test_save_file_copies_disk_spool_in_kernel(self, upload_service):
+        """Test that uploads already spooled to disk are copied with copy_file_range"""
+        upload_path = upload_service.upload_base_path / "test" / "images" / "original"
+        upload_path.mkdir(parents=True, exist_ok=True)
+        
+        content = os.urandom(3 * 1024 * 1024)
+        spool = tempfile.SpooledTemporaryFile(max_size=1024)
+        spool.write(content)
+        spool.seek(0)
+        
+        with patch('app.services.upload_service.os.copy_file_range', wraps=os.copy_file_range) as mock_copy:
+            file_path, digest = await upload_service._save_file(UploadFile(filename="big.jpg", file=spool), upload_path)
+        
+        try:
+            mock_copy.assert_called()
+            assert file_path.read_bytes() == content
+            assert digest == hashlib.sha256(content).hexdigest()
+        finally:
+            file_path.unlink()
+            spool.close()
+    
+    def test_disk_fileno_leaves_in_memory_spool_in_memory(self, upload_service):
+        """Test that an upload still held in memory is not forced onto disk"""
+        spool = tempfile.SpooledTemporaryFile(max_size=1024)
+        spool.write(b"small")
+        
+        assert upload_service._disk_fileno(spool) is None
+        assert upload_service._disk_fileno(io.BytesIO(b"small")) is None
+        assert spool.name is None  # Still in memory
+        spool.close()
+    
+    @pytest.mark.asyncio
+    async def test_store_detections_success(self, upload_service, mock_db):
+        """Test successful detection storage"""
+        detected_objects = [
+            DetectedObject("chair", 0.8, [10, 20, 30, 40]),
+            DetectedObject("table", 0.7, [50, 60, 70, 80])
+        ]
+        
+        await upload_service._store_detections("test-project", {
+            "/path/to/image.jpg": detected_objects,
+            "/path/to/other.jpg": [DetectedObject("sofa", 0.9, [1, 2, 3, 4])]
+        })
+        
+        # Verify that all images' detections were inserted in a single statement
+        mock_db.execute.assert_awaited_once()
+        rows = mock_db.execute.call_args.args[1]
+        assert [row["object_name"] for row in rows] == ["chair", "table", "sofa"]
+        assert [row["image_path"] for row in rows] == ["/path/to/image.jpg"] * 2 + ["/path/to/other.jpg"]
+        assert rows[1]["bbox_width"] == 70
+        mock_db.add.assert_not_called()
+        mock_db.commit.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_store_detections_chunks_large_inserts(self, upload_service, mock_db):
+        """Test that large detection sets are inserted in bounded chunks within one commit"""
+        upload_service.insert_chunk_size = 2
+        detected_objects = [DetectedObject("chair", 0.8, [10, 20, 30, 40])] * 5
+        
+        await upload_service._store_detections("test-project", {"/path/to/image.jpg": detected_objects})
+        
+        assert [len(call.args[1]) for call in mock_db.execute.await_args_list] == [2, 2, 1]
+        mock_db.commit.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_store_detections_skips_empty_upload(self, upload_service, mock_db):
+        """Test that an upload without relevant detections does not touch the database"""
+        with patch('app.services.upload_service.response_cache') as mock_cache:
+            await upload_service._store_detections("test-project", {"/path/to/image.jpg": []})
+        
+        mock_db.execute.assert_not_called()
+        mock_db.commit.assert_not_called()
+        mock_cache.invalidate.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_store_detections_database_error(self, upload_service, mock_db):
+        """Test detection storage with database error"""
+        mock_db.commit.side_effect = Exception("Database error")
+        
+        detected_objects = [DetectedObject("chair", 0.8, [10, 20, 30, 40])]
+        
+        with pytest.raises(RuntimeError, match="Failed to store detection results"):
+            await upload_service._store_detections("test-project", {"/path/to/image.jpg": detected_objects})
+        
+        mock_db.rollback.assert_called_once()
+    
+    def test_get_project_images_success(self, upload_service):
+        """Test getting project images"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Create mock project directory with images
+            project_path = upload_service.upload_base_path / "test-project" / "images" / "original"
+            project_path.mkdir(parents=True, exist_ok=True)
+            
+            # Create test image files
+            (project_path / "image1.jpg").touch()
+            (project_path / "image2.png").touch()
+            (project_path / "not_image.txt").touch()  # Should be ignored
+            
+            images = upload_service.get_project_images("test-project")
+            
+            assert len(images) == 2
+            assert any("image1.jpg" in img for img in images)
+            assert any("image2.png" in img for img in images)
+            assert not any("not_image.txt" in img for img in images)
+    
+    def test_get_project_images_no_directory(self, upload_service):
+        """Test getting project images when directory doesn't exist"""
+        images = upload_service.get_project_images("nonexistent-project")
+        
+        assert images == []
+    
+    def test_get_project_images_error_handling(self, upload_service):
+        """Test error handling in get_project_images"""
+        with patch('app.services.upload_service.os.scandir', side_effect=PermissionError("Access denied")):
+            images = upload_service.get_project_images("test-project")
+            
             assert images == []
\ No newline at end of file